@@ -16,9 +16,11 @@ import sys
 from pathlib import Path
 
 from . import api as api_mod
+from . import cache as cache_mod
 from . import dates as dates_mod
 from . import server as server_mod
 from . import indexer as indexer_mod
+from . import watch as watch_mod
 
 
 DEFAULT_PORT = 8088
@@ -58,7 +60,9 @@ def _try_bind(host: str, start: int, limit: int = PORT_TRY_LIMIT) -> int:
     )
 
 
-def _print_banner(host: str, port: int, tz_name: str, public: bool) -> None:
+def _print_banner(
+    host: str, port: int, tz_name: str, public: bool, watch_label: str,
+) -> None:
     # When stdout is piped to a file we still want the banner visible.
     sys.stdout.reconfigure(line_buffering=True) if hasattr(sys.stdout, "reconfigure") else None
     box = "─" * 53
@@ -71,6 +75,7 @@ def _print_banner(host: str, port: int, tz_name: str, public: bool) -> None:
     print(f"Hostname : {fq}")
     print(f"Timezone : {tz_name}")
     print(f"Logs root: {Path.home() / '.claude' / 'projects'}")
+    print(f"Watching : {watch_label}")
     print()
 
     user = os.environ.get("USER") or os.environ.get("LOGNAME") or "you"
@@ -101,7 +106,7 @@ def selftest() -> int:
     import time
 
     print("[selftest] importing modules…")
-    from . import api, cache, dates, indexer, server  # noqa: F401
+    from . import api, cache, dates, indexer, server, watch  # noqa: F401
     print("[selftest] OK")
 
     print("[selftest] writing synthetic 1MB jsonl…")
@@ -150,6 +155,8 @@ def main(argv: list[str] | None = None) -> int:
                    help="Override ~/.claude/projects directory.")
     p.add_argument("--no-banner", action="store_true",
                    help="Suppress the startup banner.")
+    p.add_argument("--clear-cache", action="store_true",
+                   help="Delete the on-disk index cache before starting.")
     p.add_argument("--selftest", action="store_true",
                    help="Run a synthetic smoke test and exit.")
     args = p.parse_args(argv)
@@ -180,13 +187,24 @@ def main(argv: list[str] | None = None) -> int:
     # Choose port (auto-iterate if busy).
     chosen_port = _try_bind(host, args.port)
 
+    if args.clear_cache and cache_mod.clear_cache():
+        print(f"Cleared index cache at {cache_mod.cache_root()}")
+
     projects_root = Path(args.projects_root).expanduser() if args.projects_root else None
-    state = api_mod.AppState(tz=tz, projects_root=projects_root, port=chosen_port)
+    watcher = watch_mod.ProjectsWatcher(projects_root or cache_mod.projects_root())
+    watcher.start()
+    state = api_mod.AppState(
+        tz=tz, projects_root=projects_root, port=chosen_port, watcher=watcher,
+    )
 
     if not args.no_banner:
-        _print_banner(host, chosen_port, tz_name, public=args.public)
+        _print_banner(host, chosen_port, tz_name, public=args.public,
+                      watch_label=watcher.describe())
 
-    server_mod.serve(state, host, chosen_port)
+    try:
+        server_mod.serve(state, host, chosen_port)
+    finally:
+        watcher.stop()
     return 0
 
 
@@ -1,25 +1,43 @@
 """
 REST API handlers.
 
-Each handler returns (status_code, headers_dict, body_bytes). The HTTP server
-just dispatches by URL path/method. State (loaded indexes, in-flight indexing
+Each handler returns (status_code, headers_dict, body). The body is bytes, or
+a Path for file responses, which the server streams with sendfile() and sizes
+itself (no Content-Length in headers_dict), or an iterator of bytes chunks that
+the server sends with chunked transfer encoding. The HTTP server just dispatches by
+URL path/method. State (loaded indexes, in-flight indexing
 tasks) lives in the AppState singleton.
 """
 
 from __future__ import annotations
 
+import hashlib
 import json
+import math
 import os
+import queue
+import re
+import stat
+import sys
 import threading
 import time
+import traceback
 import urllib.parse
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Callable
+from typing import Any, Callable, Iterator
 
 from . import cache as cache_mod
 from . import dates as dates_mod
 from . import indexer as indexer_mod
+from . import watch as watch_mod
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
 
 
 # Maximum number of full session indexes kept in memory. Each is the full
@@ -27,26 +45,147 @@ from . import indexer as indexer_mod
 # soft cap.
 MAX_INMEM_INDEXES = 8
 
+# A live session appends every second or two. Re-index a stale session at
+# most this often (seconds since its last index finished); requests in
+# between keep getting the slightly old index, which they'd get anyway.
+REINDEX_MIN_INTERVAL = 2.0
+
+# Every open tab polls /dates for the current project (PROJECT_POLL_MS in
+# app.js). Answers younger than this many seconds are shared instead of
+# re-stat'ing every session per poll per tab.
+DATES_TTL = 1.0
+
+# /dates?wait=1 holds a request for a project that is still indexing until
+# one of its sessions finishes (or this many seconds pass), so the client
+# doesn't have to poll on a timer to watch progress.
+DATES_WAIT_SECONDS = 10.0
+
+# An idle /api/events stream sends a comment line this often, so dead
+# connections are noticed and proxies don't time the stream out.
+EVENTS_PING_SECONDS = 20.0
+
+# Threads used to scan project directories in parallel for /api/projects.
+LISTING_WORKERS = min(8, os.cpu_count() or 1)
+
+# /entries reads neighbouring lines with one read() when they sit within
+# this many bytes of each other; a bigger span is split so the first entries
+# still stream out before the last ones are read.
+ENTRIES_READ_SPAN = 1 << 20
+
+# Shapes of the path components a request may name, checked after
+# unquoting. One component each (no separators, no leading dot, so no
+# '..'), which keeps every resolved file under projects_root without a
+# realpath() per request. Session paths are '<session>' or
+# '<session>/subagents/agent-<id>'.
+_NAME_RE = re.compile(r"[^/\\.][^/\\]*")
+_SESSION_PATH_RE = re.compile(
+    r"(?P<session>[^/\\.][^/\\]*)(?:/subagents/agent-[^/\\]+)?"
+)
+
+# Tool-result blobs at least this big are sent gzipped to clients that
+# accept it, from a compressed copy baked once into the cache dir (so they
+# still go out with sendfile()).
+BLOB_GZIP_MIN_BYTES = 1024
+
+# Background indexing threads shared by all sessions. Opening a project with
+# hundreds of unindexed sessions queues them here instead of starting a
+# thread per session; indexing is mostly GIL-bound, so more threads than
+# this only add contention.
+INDEX_WORKERS = min(4, os.cpu_count() or 1)
+
+
+class _WorkerPool:
+    """
+    Fixed set of daemon threads draining a FIFO of (fn, args) jobs.
+
+    Not a ThreadPoolExecutor: its workers are joined at interpreter exit and
+    keep draining the queue until then, so Ctrl+C would wait for every queued
+    index to finish.
+    """
+    def __init__(self, workers: int, name: str) -> None:
+        self._jobs: queue.SimpleQueue = queue.SimpleQueue()
+        for i in range(workers):
+            threading.Thread(target=self._run, daemon=True, name=f"{name}:{i}").start()
+
+    def submit(self, fn: Callable[..., None], *args: Any) -> None:
+        self._jobs.put((fn, args))
+
+    def _run(self) -> None:
+        while True:
+            fn, args = self._jobs.get()
+            try:
+                fn(*args)
+            except Exception:
+                # A failing job must not take its worker with it: the pool
+                # would shrink silently until indexing stalls.
+                sys.stderr.write(f"{threading.current_thread().name}: job failed\n")
+                traceback.print_exc()
+
 
 class AppState:
     """
     Server-wide state. Threadsafe. Created once in server.py and passed to
     every handler.
     """
-    def __init__(self, tz, projects_root: Path | None = None, port: int = 8088) -> None:
+    def __init__(
+        self, tz, projects_root: Path | None = None, port: int = 8088,
+        watcher: watch_mod.ProjectsWatcher | None = None,
+    ) -> None:
         self.tz = tz
         self.tz_name = dates_mod.tz_name(tz)
         self.projects_root = projects_root or cache_mod.projects_root()
         self.port = port
+        # Optional change tracker. When present, list_projects() is only
+        # recomputed after the watcher reports a change.
+        self.watcher = watcher
         self._lock = threading.Lock()
+        # (project_id, session_path) -> index epoch at which the loaded index
+        # was installed. Stub ETags are built from it: O(1), no hashing.
+        self._index_version: dict[tuple[str, str], int] = {}
+        # Sessions whose jsonl changed again while their index was being
+        # rebuilt; the running worker re-runs once instead of the change
+        # being dropped until the next request.
+        self._reindex_pending: set[tuple[str, str]] = set()
+        # Bumped (and notified) whenever a background index finishes or
+        # fails; /dates?wait=1 long-polls block on it.
+        self._index_done = threading.Condition(self._lock)
+        self._index_epoch = 0
         # (project_id, session_path) -> index dict
         self._indexes: "OrderedDict[tuple[str,str], dict[str, Any]]" = OrderedDict()
         # (project_id, session_path) -> Progress (in-flight only)
         self._progress: dict[tuple[str, str], indexer_mod.Progress] = {}
-        # (project_id, session_path) -> threading.Thread
-        self._threads: dict[tuple[str, str], threading.Thread] = {}
-        # cached project metadata: project_id -> {label, sessions: [...], discovered_at}
-        self._project_meta: dict[str, dict[str, Any]] = {}
+        # Runs _index_worker jobs; see INDEX_WORKERS.
+        self._index_pool = _WorkerPool(INDEX_WORKERS, "indexer")
+        # (project_id, session_path) -> time.monotonic() of last finished index
+        self._indexed_at: dict[tuple[str, str], float] = {}
+        # (project_id, session_path) -> watcher generation at which the
+        # in-memory index was last confirmed to match its jsonl.
+        self._checked_gen: dict[tuple[str, str], int] = {}
+        # project_id -> {session_path: indexer.summarize_index() dict}. Mirrored
+        # to cache.date_index_path() so a restart can answer /dates without
+        # loading every session's full index.
+        self._summaries: dict[str, dict[str, dict[str, Any]]] = {}
+        self._summaries_dirty: set[str] = set()
+        # project_id -> (time.monotonic(), watcher generation or None,
+        # project_dates() result)
+        self._dates_memo: dict[str, tuple[float, int | None, tuple[Any, Any]]] = {}
+        # project_id -> (response dict, its encoded body, ETag). Valid while
+        # project_dates() keeps handing out that same dict.
+        self._dates_body: dict[str, tuple[dict[str, Any], bytes, str]] = {}
+        # (watcher generation, list_projects() result)
+        self._projects_cache: tuple[int, list[dict[str, Any]]] | None = None
+        # (watcher generation, encoded /api/projects body)
+        self._projects_body: tuple[int, bytes] | None = None
+        # Distinguishes ETags across restarts (generations restart at 0).
+        self._boot_id = f"{int(time.time()):x}"
+        # Subagent / tool-result listings for first-page stub responses:
+        # (watcher generation, {session_dir: (subagents, blob names)}).
+        # Only kept with the event-driven watcher; see _event_generation().
+        self._attachments: tuple[int, dict[str, tuple[list[dict[str, Any]], list[str]]]] = (-1, {})
+        # Encoded /api/config body, built on first request.
+        self._config_body: bytes | None = None
+        if watcher is not None:
+            watcher.add_listener(self._on_paths_changed)
 
     # ---- index access ----------------------------------------------------
 
@@ -75,10 +214,25 @@ class AppState:
           - (None, prog)   -> still indexing
           - (None, None)   -> file missing
         """
-        if not jsonl_path.exists():
+        key = (project_id, session_path)
+        gen = self._event_generation()
+        if gen is not None:
+            with self._lock:
+                idx = self._indexes.get(key)
+                if idx is not None and self._checked_gen.get(key) == gen:
+                    # Nothing under the tree changed since this index was
+                    # last checked against its jsonl: skip the stat.
+                    self._indexes.move_to_end(key)
+                    return (idx, None)
+
+        # One stat answers both "does it exist" and "has it grown".
+        try:
+            st = jsonl_path.stat()
+        except OSError:
+            with self._lock:
+                self._indexes.pop(key, None)
             return (None, None)
 
-        key = (project_id, session_path)
         with self._lock:
             idx = self._indexes.get(key)
             stale = False
@@ -88,28 +242,22 @@ class AppState:
                 # background update so subsequent F5s see fresh data. This is
                 # better than dropping the cache and forcing a 202-loading
                 # state for every request during incremental re-index.
-                try:
-                    st = jsonl_path.stat()
-                    cached_size = idx.get("file_size", -1)
-                    cached_mtime = idx.get("file_mtime", -1.0)
-                    if (st.st_size != cached_size or
-                            abs(st.st_mtime - cached_mtime) > 0.001):
-                        stale = True
-                except OSError:
-                    self._indexes.pop(key, None)
-                    idx = None
+                cached_size = idx.get("file_size", -1)
+                cached_mtime = idx.get("file_mtime", -1.0)
+                if (st.st_size != cached_size or
+                        abs(st.st_mtime - cached_mtime) > 0.001):
+                    if key in self._progress:
+                        # A re-index is already running and may have sized
+                        # the file before this change: have it go again.
+                        self._reindex_pending.add(key)
+                    last = self._indexed_at.get(key, 0.0)
+                    stale = time.monotonic() - last >= REINDEX_MIN_INTERVAL
+                elif gen is not None:
+                    self._checked_gen[key] = gen
 
             # Schedule background update for stale or first-time index.
             if (idx is None or stale) and key not in self._progress:
-                prog_v = indexer_mod.Progress(jsonl_path.stat().st_size)
-                self._progress[key] = prog_v
-                t = threading.Thread(
-                    target=self._index_worker,
-                    args=(project_id, session_path, jsonl_path, key, prog_v),
-                    daemon=True, name=f"indexer:{session_path}",
-                )
-                self._threads[key] = t
-                t.start()
+                self._schedule_index_locked(project_id, session_path, jsonl_path, st.st_size)
 
             # If we have an index (even stale), return it immediately.
             if idx is not None:
@@ -120,6 +268,87 @@ class AppState:
             prog = self._progress.get(key)
             return (None, prog)
 
+    def _on_paths_changed(self, paths: set[str]) -> None:
+        """
+        Watcher callback (debounced) with the jsonl paths written since the
+        last call. Sessions that are loaded in memory get their incremental
+        re-index started now instead of on the next request, and affected
+        projects drop their /dates TTL copy.
+        """
+        root = self.projects_root
+        projects = set()
+        for p in paths:
+            try:
+                projects.add(Path(p).relative_to(root).parts[0])
+            except (ValueError, IndexError):
+                continue
+        with self._lock:
+            for pid in projects:
+                self._dates_memo.pop(pid, None)
+            loaded = [k for k in self._indexes if k[0] in projects]
+        for project_id, session_path in loaded:
+            jsonl = root / project_id / f"{session_path}.jsonl"
+            if str(jsonl) in paths:
+                self.ensure_index(project_id, session_path, jsonl)
+
+    def session_attachments(
+        self, session_path: str, session_dir: Path,
+    ) -> tuple[list[dict[str, Any]], list[str]]:
+        """
+        (subagent descriptors, tool-result blob names) for a top-level
+        session. Listing them costs two directory scans plus a stat per
+        subagent, so with an event-driven watcher the answer is reused until
+        the generation moves; subagent writes and the jsonl lines that
+        reference new blobs both bump it.
+        """
+        gen = self._event_generation()
+        key = str(session_dir)
+        if gen is not None:
+            with self._lock:
+                cached_gen, listings = self._attachments
+                if cached_gen == gen and key in listings:
+                    return listings[key]
+        subagents = []
+        for p in cache_mod.discover_subagents(session_dir):
+            try:
+                size = p.stat().st_size
+            except OSError:
+                continue
+            subagents.append({
+                "path": f"{session_path}/subagents/{p.stem}",
+                "name": p.stem,
+                "size": size,
+            })
+        got = (subagents, cache_mod.discover_tool_result_blobs(session_dir))
+        if gen is not None:
+            with self._lock:
+                if self._attachments[0] != gen:
+                    self._attachments = (gen, {})
+                self._attachments[1][key] = got
+        return got
+
+    def _event_generation(self) -> int | None:
+        """
+        Watcher generation, if the watcher is event-driven. A polling watcher
+        lags real writes by up to its interval, so its generation can't stand
+        in for a stat (F5 must still pick up freshly appended lines).
+        """
+        w = self.watcher
+        if w is None or w.backend != "watchdog":
+            return None
+        return w.generation
+
+    def _schedule_index_locked(
+        self, project_id: str, session_path: str, jsonl_path: Path, size: int,
+    ) -> None:
+        """Queue a background (re-)index. Call with self._lock held."""
+        key = (project_id, session_path)
+        prog = indexer_mod.Progress(size)
+        self._progress[key] = prog
+        self._index_pool.submit(
+            self._index_worker, project_id, session_path, jsonl_path, key, prog,
+        )
+
     def _index_worker(self, project_id, session_path, jsonl_path, key, prog) -> None:
         try:
             new_idx = indexer_mod.index_session(
@@ -127,19 +356,118 @@ class AppState:
             )
             with self._lock:
                 self._indexes[key] = new_idx
+                self._indexed_at[key] = time.monotonic()
+                self._remember_summary_locked(project_id, session_path, new_idx)
+                # A finished index changes /dates; don't serve the TTL copy.
+                self._dates_memo.pop(project_id, None)
                 self._evict_locked()
                 prog.finish()
                 self._progress.pop(key, None)
-                self._threads.pop(key, None)
+                self._index_epoch += 1
+                self._index_version[key] = self._index_epoch
+                self._index_done.notify_all()
+                pending = key in self._reindex_pending
+                self._reindex_pending.discard(key)
         except Exception as e:
             prog.fail(repr(e))
             with self._lock:
-                self._threads.pop(key, None)
+                self._reindex_pending.discard(key)
+                self._index_epoch += 1
+                self._index_done.notify_all()
+            return
+        if not pending:
+            return
+        # Something looked at this session mid-run and saw a newer file.
+        # Go again only if this run really ended short of the current size;
+        # it is a cheap incremental pass from the offset just recorded.
+        try:
+            size = jsonl_path.stat().st_size
+        except OSError:
+            return
+        if size == new_idx.get("file_size"):
+            return
+        with self._lock:
+            if key in self._indexes and key not in self._progress:
+                self._schedule_index_locked(project_id, session_path, jsonl_path, size)
+
+    def index_epoch(self) -> int:
+        """Count of background index runs finished so far."""
+        with self._lock:
+            return self._index_epoch
+
+    def wait_for_index(self, since: int, timeout: float) -> int:
+        """
+        Block until a background index finishes after epoch `since` was
+        read, or `timeout` seconds pass; return the epoch either way.
+        """
+        with self._index_done:
+            self._index_done.wait_for(lambda: self._index_epoch != since, timeout)
+            return self._index_epoch
+
+    def _remember_summary_locked(
+        self, project_id: str, session_path: str, idx: dict[str, Any],
+    ) -> None:
+        """Record a top-level session's summary. Call with self._lock held."""
+        summaries = self._summaries.get(project_id)
+        if summaries is None or "/" in session_path:
+            # Project rollup not loaded yet (it will be seeded from this
+            # index on first /dates), or a subagent (never in the rollup).
+            return
+        summaries[session_path] = indexer_mod.summarize_index(idx)
+        self._summaries_dirty.add(project_id)
+
+    def _project_summaries(self, project_id: str) -> dict[str, dict[str, Any]]:
+        """Session summaries for a project, read from disk on first use."""
+        with self._lock:
+            got = self._summaries.get(project_id)
+        if got is not None:
+            return got
+        loaded: dict[str, dict[str, Any]] = {}
+        data = cache_mod.load_cache(cache_mod.date_index_path(project_id))
+        if data is not None and data.get("tz") == self.tz_name:
+            loaded = data.get("sessions") or {}
+        with self._lock:
+            return self._summaries.setdefault(project_id, loaded)
+
+    def _flush_summaries(self, project_id: str, live: set[str]) -> None:
+        """Persist a project's summaries if they changed, dropping removed sessions."""
+        with self._lock:
+            if project_id not in self._summaries_dirty:
+                return
+            self._summaries_dirty.discard(project_id)
+            sessions = {
+                k: v for k, v in self._summaries.get(project_id, {}).items()
+                if k in live
+            }
+        try:
+            cache_mod.save_cache(
+                cache_mod.date_index_path(project_id),
+                {"tz": self.tz_name, "sessions": sessions},
+            )
+        except OSError:
+            # Read-only cache dir: the rollup is an optimization only.
+            pass
 
     def _evict_locked(self) -> None:
         """Drop oldest entries when over the cap. Call with self._lock held."""
         while len(self._indexes) > MAX_INMEM_INDEXES:
-            self._indexes.popitem(last=False)
+            key, _ = self._indexes.popitem(last=False)
+            self._checked_gen.pop(key, None)
+            self._index_version.pop(key, None)
+
+    def index_version(
+        self, project_id: str, session_path: str, idx: dict[str, Any],
+    ) -> int | None:
+        """
+        Version number of `idx` if it is still the loaded index for this
+        session; it changes every time a re-index installs a new one. None
+        if `idx` has been replaced or evicted meanwhile.
+        """
+        key = (project_id, session_path)
+        with self._lock:
+            if self._indexes.get(key) is not idx:
+                return None
+            return self._index_version.get(key)
 
     # ---- project metadata ------------------------------------------------
 
@@ -149,40 +477,63 @@ class AppState:
         project picker. Filters out projects with zero sessions and sorts by
         most-recently-modified session first so the user lands on the project
         they're actively working in.
+
+        With a watcher attached the listing is reused until the watcher's
+        generation moves, so idle polls don't stat every session file.
         """
-        out: list[dict[str, Any]] = []
-        for pdir in cache_mod.discover_projects(self.projects_root):
-            sessions = cache_mod.discover_sessions(pdir)
-            if not sessions:
-                # Skip projects with no jsonl sessions — they only clutter
-                # the picker (e.g. cache leftovers, deleted logs).
-                continue
-            # Project mtime = max session jsonl mtime. Cheap stat() loop;
-            # number of sessions per project is small (tens at most).
-            mtime = 0.0
-            for sjsonl in sessions:
-                try:
-                    st = sjsonl.stat()
-                    if st.st_mtime > mtime:
-                        mtime = st.st_mtime
-                except OSError:
-                    continue
-            # Project dir names follow CC's convention: leading '-' then path
-            # with '/' -> '-'. We can't disambiguate real dashes from path
-            # separators, so just strip the leading dash and show the rest as
-            # a path-like label without converting.
-            display_name = pdir.name.lstrip("-") or pdir.name
-            out.append({
-                "id": pdir.name,
-                "display_name": display_name,
-                "session_count": len(sessions),
-                "session_paths": [s.stem for s in sessions],
-                "mtime": mtime,
-            })
+        gen = self.watcher.generation if self.watcher is not None else None
+        with self._lock:
+            cached = self._projects_cache
+            if gen is not None and cached is not None and cached[0] == gen:
+                return cached[1]
+        # Each project costs a directory read plus a stat() per session; on
+        # network home directories that is latency-bound, so overlap them.
+        pdirs = cache_mod.discover_projects(self.projects_root)
+        # The watcher's walks already saw every session's mtime; only
+        # projects it can't vouch for are stat'ed here.
+        mtimes = self.watcher.project_mtimes() if self.watcher is not None else {}
+        workers = max(1, min(LISTING_WORKERS, len(pdirs)))
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            rows = ex.map(lambda p: _project_listing(p, mtimes.get(p.name)), pdirs)
+            out = [p for p in rows if p is not None]
         # Newest-modified first.
         out.sort(key=lambda p: p["mtime"], reverse=True)
+        if gen is not None:
+            with self._lock:
+                self._projects_cache = (gen, out)
         return out
 
+    def refresh(self) -> None:
+        """
+        Manual refresh from the UI: forget short-lived caches so the
+        follow-up GETs rescan, and nudge the watcher so its generation (and
+        thus the /api/projects ETag) moves even if it missed an event.
+        """
+        with self._lock:
+            self._dates_memo.clear()
+            self._indexed_at.clear()
+        if self.watcher is not None:
+            self.watcher.nudge()
+
+    def projects_body(self) -> tuple[bytes, str | None]:
+        """
+        Encoded /api/projects payload plus its ETag.
+
+        The bytes are cached per watcher generation, so an unchanged tree
+        costs neither a directory walk nor a JSON encode. Without a watcher
+        there is nothing to key on: rebuild every time and send no ETag.
+        """
+        if self.watcher is None:
+            return (_encode_json({"projects": self.list_projects()}), None)
+        gen = self.watcher.generation
+        with self._lock:
+            cached = self._projects_body
+        if cached is None or cached[0] != gen:
+            cached = (gen, _encode_json({"projects": self.list_projects()}))
+            with self._lock:
+                self._projects_body = cached
+        return (cached[1], f'W/"{self._boot_id}-{cached[0]}"')
+
     def project_dates(
         self, project_id: str,
     ) -> tuple[dict[str, Any] | None, list[tuple[str, str, str]] | None]:
@@ -194,32 +545,105 @@ class AppState:
 
         response shape:
           { tz, project_id, indexed: int, in_progress: int, dates: [...] }
+
+        Results are reused for DATES_TTL seconds, so N tabs polling the same
+        project cost one directory scan per TTL rather than N. With an
+        event-driven watcher a settled result (nothing indexing) is reused
+        past the TTL until the generation moves; finished index runs drop
+        the memo themselves.
         """
+        now = time.monotonic()
+        gen = self._event_generation()
+        with self._lock:
+            memo = self._dates_memo.get(project_id)
+        if memo is not None:
+            if now - memo[0] < DATES_TTL:
+                return memo[2]
+            if gen is not None and memo[1] == gen and not memo[2][1]:
+                return memo[2]
+        result = self._compute_project_dates(project_id)
+        if result[0] is not None:
+            with self._lock:
+                self._dates_memo[project_id] = (now, gen, result)
+        return result
+
+    def dates_body(self, project_id: str, response: dict[str, Any]) -> tuple[bytes, str]:
+        """
+        Encoded body and ETag for a settled project_dates() response. While
+        the memo keeps returning the same dict, every poll reuses the bytes
+        (and, in server.py, their gzip keyed on the ETag) instead of
+        re-encoding and re-hashing the rollup.
+        """
+        with self._lock:
+            cached = self._dates_body.get(project_id)
+        if cached is not None and cached[0] is response:
+            return (cached[1], cached[2])
+        body = _encode_json(response)
+        # Digest of the body, so an unchanged rollup keeps its ETag even
+        # when it had to be recomputed.
+        etag = f'W/"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+        with self._lock:
+            self._dates_body[project_id] = (response, body, etag)
+        return (body, etag)
+
+    def _compute_project_dates(
+        self, project_id: str,
+    ) -> tuple[dict[str, Any] | None, list[tuple[str, str, str]] | None]:
         project_dir = self.projects_root / project_id
-        if not project_dir.exists():
+        listing = cache_mod.scan_project(project_dir)
+        if listing is None:
             return (None, None)
 
-        sessions = cache_mod.discover_sessions(project_dir)
+        sessions, session_dirs = listing
+        summaries = self._project_summaries(project_id)
         index_records: list[dict[str, Any]] = []
         in_flight: list[tuple[str, str, str]] = []
         ready_count = 0
+        # Sessions whose first index run is still going. Without a summary
+        # their answer is "in flight" whatever the jsonl looks like now, so
+        # the polls that arrive while a cold project indexes skip the stat
+        # and ensure_index() for them.
+        with self._lock:
+            indexing = {
+                key[1] for key in self._progress
+                if key[0] == project_id and key not in self._indexes
+            }
 
         for sjsonl in sessions:
             spath = sjsonl.stem
-            idx, prog = self.ensure_index(project_id, spath, sjsonl)
-            label = self._session_label(project_id, spath, sjsonl)
-            session_dir = sjsonl.parent / spath
-            has_subs = cache_mod.has_subagents(session_dir)  # O(1), not enumerate
-            if idx is None:
+            summary = summaries.get(spath)
+            if summary is None and spath in indexing:
+                label = self._session_label(project_id, spath, sjsonl)
                 in_flight.append((spath, label, str(sjsonl)))
                 continue
+            try:
+                st = sjsonl.stat()
+            except OSError:
+                continue
+            if (summary is None or summary.get("file_size") != st.st_size or
+                    abs(summary.get("file_mtime", -1.0) - st.st_mtime) > 0.001):
+                # No summary, or the jsonl moved on since: go through the
+                # full index (which also schedules the background update).
+                idx, prog = self.ensure_index(project_id, spath, sjsonl)
+                if idx is None:
+                    label = self._session_label(project_id, spath, sjsonl)
+                    in_flight.append((spath, label, str(sjsonl)))
+                    continue
+                summary = indexer_mod.summarize_index(idx)
+                with self._lock:
+                    self._remember_summary_locked(project_id, spath, idx)
+            # Most sessions have no <session>/ dir at all; the project
+            # listing already says which do, so only those get probed.
+            has_subs = (spath in session_dirs and
+                        cache_mod.has_subagents(sjsonl.parent / spath))
             ready_count += 1
             index_records.append({
                 "__session_path": spath,
-                "__index": idx,
-                "__label": label,
+                "__summary": summary,
+                "__label": summary.get("label") or "",
                 "__has_subagents": has_subs,
             })
+        self._flush_summaries(project_id, {s.stem for s in sessions})
         rolled = indexer_mod.aggregate_project_dates(
             project_id, project_dir, self.tz, index_records,
         )
@@ -239,25 +663,104 @@ class AppState:
         )
 
     def _session_label(self, project_id: str, session_path: str, jsonl_path: Path) -> str:
-        """Cache labels in self._project_meta[project_id]['labels']."""
-        meta = self._project_meta.setdefault(project_id, {"labels": {}})
-        labels = meta["labels"]
-        if session_path in labels:
-            return labels[session_path]
-        lbl = indexer_mod.derive_session_label(jsonl_path)
-        labels[session_path] = lbl
-        return lbl
+        """
+        Label for a session that has no index yet. derive_session_label()
+        memoizes on (path, mtime, size), so a session that is still empty
+        when first polled gets its label once the first prompt lands.
+        """
+        return indexer_mod.derive_session_label(jsonl_path)
+
+
+def _project_listing(pdir: Path, mtime: float | None = None) -> dict[str, Any] | None:
+    """
+    One /api/projects row, or None for a project with no sessions. `mtime`
+    is the newest session mtime when the watcher already knows it.
+    """
+    sessions = cache_mod.discover_sessions(pdir)
+    if not sessions:
+        # Skip projects with no jsonl sessions — they only clutter
+        # the picker (e.g. cache leftovers, deleted logs).
+        return None
+    if mtime is None:
+        # Project mtime = max session jsonl mtime. Cheap stat() loop;
+        # number of sessions per project is small (tens at most).
+        mtime = 0.0
+        for sjsonl in sessions:
+            try:
+                st = sjsonl.stat()
+                if st.st_mtime > mtime:
+                    mtime = st.st_mtime
+            except OSError:
+                continue
+    # Project dir names follow CC's convention: leading '-' then path
+    # with '/' -> '-'. We can't disambiguate real dashes from path
+    # separators, so just strip the leading dash and show the rest as
+    # a path-like label without converting.
+    display_name = pdir.name.lstrip("-") or pdir.name
+    return {
+        "id": pdir.name,
+        "display_name": display_name,
+        "session_count": len(sessions),
+        "session_paths": [s.stem for s in sessions],
+        "mtime": mtime,
+    }
 
 
 # ---- handler helpers -----------------------------------------------------
 
+def _encode_json(payload: Any) -> bytes:
+    """
+    UTF-8 JSON bytes. orjson (when importable) encodes big stub/entry pages
+    several times faster; anything it refuses goes through the stdlib.
+    """
+    if HAS_ORJSON:
+        try:
+            return orjson.dumps(payload)
+        except TypeError:  # orjson.JSONEncodeError subclasses TypeError
+            pass
+    try:
+        return json.dumps(
+            payload, ensure_ascii=False, separators=(",", ":"), allow_nan=False,
+        ).encode("utf-8")
+    except ValueError:  # includes UnicodeEncodeError
+        # NaN/Infinity (not JSON) or lone surrogates (not UTF-8), as parsed
+        # from odd log lines: null the former like orjson does and escape
+        # the latter, so the browser's JSON.parse still accepts the body.
+        return json.dumps(_finite(payload), separators=(",", ":")).encode("ascii")
+
+
+def _finite(value: Any) -> Any:
+    """Copy of a decoded JSON value with NaN/Infinity replaced by None."""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {k: _finite(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_finite(v) for v in value]
+    return value
+
+
+# Constant bodies, encoded once at import rather than per request.
+_OK_BODY = _encode_json({"ok": True})
+_INDEXING_BODY = _encode_json({"indexing": True})
+
+
 def _json_response(payload: Any, status: int = 200) -> tuple[int, dict[str, str], bytes]:
-    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    return _json_bytes_response(_encode_json(payload), status)
+
+
+def _json_bytes_response(
+    body: bytes, status: int = 200, cache: str = "no-store", etag: str | None = None,
+) -> tuple[int, dict[str, str], bytes]:
+    """The one place JSON response headers are built."""
+    # Fresh headers every time: the server adds Content-Encoding/Vary to them.
     headers = {
         "Content-Type": "application/json; charset=utf-8",
         "Content-Length": str(len(body)),
-        "Cache-Control": "no-store",
+        "Cache-Control": cache,
     }
+    if etag is not None:
+        headers["ETag"] = etag
     return (status, headers, body)
 
 
@@ -265,6 +768,42 @@ def _err(status: int, msg: str) -> tuple[int, dict[str, str], bytes]:
     return _json_response({"error": msg}, status=status)
 
 
+def file_etag(st: os.stat_result) -> str:
+    """Weak validator for a file body: changes whenever it is rewritten."""
+    return f'W/"{st.st_mtime_ns:x}-{st.st_size:x}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """RFC 7232 weak comparison against an If-None-Match header value."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    want = etag[2:] if etag.startswith("W/") else etag
+    for tok in if_none_match.split(","):
+        tok = tok.strip()
+        if tok.startswith("W/"):
+            tok = tok[2:]
+        if tok == want:
+            return True
+    return False
+
+
+def _conditional_json(
+    body: bytes, etag: str | None, if_none_match: str | None,
+) -> tuple[int, dict[str, str], bytes]:
+    """
+    Serve pre-encoded JSON with an ETag, or a bodiless 304 when the client
+    already holds this version. 'no-cache' (not 'no-store') lets the browser
+    keep the body around and revalidate it on the next fetch.
+    """
+    if etag is None:
+        return _json_bytes_response(body)
+    if etag_matches(if_none_match, etag):
+        return (304, {"ETag": etag, "Cache-Control": "no-cache"}, b"")
+    return _json_bytes_response(body, cache="no-cache", etag=etag)
+
+
 def _split_session_path(rest: str) -> tuple[str, str]:
     """
     Parse '<projectId>/<sessionPath>...' returning (project_id, session_path).
@@ -284,59 +823,114 @@ def _resolve_session_jsonl(
 ) -> Path | None:
     """
     Given session_path like 'uuid' or 'uuid/subagents/agent-X', return the
-    jsonl Path. Returns None if the path escapes the project dir.
+    jsonl Path. Returns None for malformed ids (which includes anything that
+    would escape the project dir) or a missing file.
     """
-    project_dir = state.projects_root / project_id
-    if not project_dir.exists() or not project_dir.is_dir():
-        return None
-    if "/" not in session_path:
-        path = project_dir / f"{session_path}.jsonl"
-    else:
-        # Subagent: <uuid>/subagents/agent-<id>
-        path = project_dir / f"{session_path}.jsonl"
-    # Path traversal guard
-    try:
-        path.resolve().relative_to(project_dir.resolve())
-    except ValueError:
+    if not _NAME_RE.fullmatch(project_id) or not _SESSION_PATH_RE.fullmatch(session_path):
         return None
-    return path if path.exists() else None
+    path = state.projects_root / project_id / f"{session_path}.jsonl"
+    # A missing project dir fails this same stat; no separate probe.
+    return path if path.is_file() else None
 
 
 # ---- handlers ------------------------------------------------------------
 
 def handle_config(state: AppState) -> tuple[int, dict[str, str], bytes]:
-    import socket
-    hostname = socket.getfqdn() or socket.gethostname()
-    user = os.environ.get("USER") or os.environ.get("LOGNAME") or "user"
-    p = state.port
-    return _json_response({
-        "tz": state.tz_name,
-        "hostname": hostname,
-        "user": user,
-        "port": p,
-        "ssh_hint": f"ssh -L {p}:127.0.0.1:{p} {user}@{hostname}",
-        "projects_root": str(state.projects_root),
-    })
+    # Nothing here changes while the server runs, and getfqdn() can block on
+    # a DNS lookup: build the body once and hand out the same bytes.
+    body = state._config_body
+    if body is None:
+        import socket
+        hostname = socket.getfqdn() or socket.gethostname()
+        user = os.environ.get("USER") or os.environ.get("LOGNAME") or "user"
+        p = state.port
+        body = state._config_body = _encode_json({
+            "tz": state.tz_name,
+            "hostname": hostname,
+            "user": user,
+            "port": p,
+            "ssh_hint": f"ssh -L {p}:127.0.0.1:{p} {user}@{hostname}",
+            "projects_root": str(state.projects_root),
+        })
+    return _json_bytes_response(body)
 
 
-def handle_projects(state: AppState) -> tuple[int, dict[str, str], bytes]:
-    return _json_response({"projects": state.list_projects()})
+def handle_projects(
+    state: AppState, if_none_match: str | None = None,
+) -> tuple[int, dict[str, str], bytes]:
+    body, etag = state.projects_body()
+    return _conditional_json(body, etag, if_none_match)
+
+
+def handle_refresh(state: AppState) -> tuple[int, dict[str, str], bytes]:
+    state.refresh()
+    return _json_bytes_response(_OK_BODY)
+
+
+def handle_events(state: AppState) -> tuple[int, dict[str, str], bytes | Iterator[bytes]]:
+    """
+    Server-sent events: one `change` event each time the watcher's
+    generation moves, so open tabs learn about new log lines without
+    polling. The stream never ends on its own; the browser closes it.
+    """
+    if state.watcher is None:
+        return _err(404, "no file watcher running")
+    headers = {
+        "Content-Type": "text/event-stream; charset=utf-8",
+        "Cache-Control": "no-cache",
+    }
+    return (200, headers, _iter_events(state.watcher))
+
+
+def _iter_events(watcher: watch_mod.ProjectsWatcher) -> Iterator[bytes]:
+    gen = watcher.generation
+    yield b"retry: 3000\n\n"
+    while True:
+        new = watcher.wait_for_change(gen, EVENTS_PING_SECONDS)
+        if new == gen:
+            yield b": ping\n\n"
+            continue
+        gen = new
+        yield b'event: change\ndata: {"generation": %d}\n\n' % gen
 
 
 def handle_project_dates(
-    state: AppState, project_id: str,
+    state: AppState, project_id: str, if_none_match: str | None = None,
+    wait: bool = False,
 ) -> tuple[int, dict[str, str], bytes]:
+    """
+    Per-date rollup for a project. With `wait`, a project that is still
+    indexing is answered only once one of its sessions finishes (or after
+    DATES_WAIT_SECONDS), turning the client's progress polling into a
+    long poll.
+    """
     project_id = urllib.parse.unquote(project_id)
+    if not _NAME_RE.fullmatch(project_id):
+        # '..', '/', '\\': would read (and cache writes would land) outside
+        # the projects tree.
+        return _err(404, f"project {project_id!r} not found")
+    # Read before computing, so a finish in between isn't missed.
+    epoch = state.index_epoch()
     response, in_flight = state.project_dates(project_id)
     if response is None:
         return _err(404, f"project {project_id!r} not found")
-    status = 200 if not in_flight else 202
-    return _json_response(response, status=status)
+    if in_flight and wait:
+        state.wait_for_index(epoch, DATES_WAIT_SECONDS)
+        response, in_flight = state.project_dates(project_id)
+        if response is None:
+            return _err(404, f"project {project_id!r} not found")
+    if in_flight:
+        # Still indexing: the client polls and wants every change.
+        return _json_response(response, status=202)
+    # Settled rollup: the ETag is a digest of the body, so an unchanged
+    # project revalidates as a bodiless 304.
+    body, etag = state.dates_body(project_id, response)
+    return _conditional_json(body, etag, if_none_match)
 
 
 def handle_session_stubs(
     state: AppState, project_id: str, session_path: str,
-    offset: int, limit: int, with_meta: bool,
+    offset: int, limit: int, with_meta: bool, if_none_match: str | None = None,
 ) -> tuple[int, dict[str, str], bytes]:
     project_id = urllib.parse.unquote(project_id)
     session_path = urllib.parse.unquote(session_path)
@@ -351,9 +945,31 @@ def handle_session_stubs(
             "progress": snap,
         }, status=202)
 
+    # A stub page only changes when a re-index installs a new index, so its
+    # ETag is that index's version number: revalidating an unchanged page
+    # is answered before any stub is built. The first page of a top-level
+    # session also lists subagents/blobs, which move with the watcher
+    # generation; only an event-driven watcher keeps that current. The
+    # window is part of the tag so each page's tag is unique to its body
+    # (server.py caches gzipped bodies by ETag).
+    etag = None
+    version = state.index_version(project_id, session_path, idx)
+    if version is not None:
+        tag = f"{state._boot_id}-s{version}-{offset}-{limit}"
+        if with_meta and "/" not in session_path:
+            gen = state._event_generation()
+            if gen is not None:
+                etag = f'W/"{tag}-{gen}"'
+        else:
+            etag = f'W/"{tag}"'
+    if etag is not None and etag_matches(if_none_match, etag):
+        return (304, {"ETag": etag, "Cache-Control": "no-cache"}, b"")
+
     entries = idx.get("entries", [])
     total = len(entries)
     end = min(offset + limit, total)
+    codes = indexer_mod.filter_codes(idx)
+    class_of = indexer_mod.FILTER_CLASSES_BY_CODE
     stubs = []
     for i in range(offset, end):
         e = entries[i]
@@ -369,7 +985,7 @@ def handle_session_stubs(
             "isCompactSummary": e.get("isCompactSummary"),
             "isSidechain": e.get("isSidechain"),
             "ext_blobs": e.get("ext_blobs"),
-            "filter_class": indexer_mod._classify_for_filter(e),
+            "filter_class": class_of[codes[i]],
         }
         stubs.append(stub)
 
@@ -384,36 +1000,26 @@ def handle_session_stubs(
         response["fork"] = idx.get("fork")
         response["by_date"] = idx.get("by_date", {})
         response["day_map"] = idx.get("day_map", {})
-        # 1-char codes per entry; matches FILTER_CODES in app.js.
-        codes = {
-            "user": "u", "assistant_text": "a", "assistant_tool": "t",
-            "tool_result": "r", "assistant_thinking": "T",
-            "compact_summary": "c", "command_inject": "C",
-            "meta": "m", "other": "o",
-        }
-        response["filter_classes"] = "".join(
-            codes[indexer_mod._classify_for_filter(e)] for e in entries
-        )
+        # 1-char codes per entry, precomputed at index time.
+        response["filter_classes"] = codes
         # Subagent files (under <session_dir>/subagents/) and tool-results blobs.
         if "/" not in session_path:
-            session_dir = jsonl.parent / session_path
-            subs = cache_mod.discover_subagents(session_dir)
-            response["subagents"] = [
-                {"path": f"{session_path}/subagents/{p.stem}",
-                 "name": p.stem,
-                 "size": p.stat().st_size}
-                for p in subs
-            ]
-            response["tool_result_blobs"] = cache_mod.discover_tool_result_blobs(session_dir)
+            subs, blobs = state.session_attachments(
+                session_path, jsonl.parent / session_path,
+            )
+            response["subagents"] = subs
+            response["tool_result_blobs"] = blobs
         else:
             response["subagents"] = []
             response["tool_result_blobs"] = []
-    return _json_response(response)
+    if etag is None:
+        return _json_response(response)
+    return _conditional_json(_encode_json(response), etag, None)
 
 
 def handle_session_entries(
     state: AppState, project_id: str, session_path: str, indices: list[int],
-) -> tuple[int, dict[str, str], bytes]:
+) -> tuple[int, dict[str, str], bytes | Iterator[bytes]]:
     project_id = urllib.parse.unquote(project_id)
     session_path = urllib.parse.unquote(session_path)
     jsonl = _resolve_session_jsonl(state, project_id, session_path)
@@ -421,57 +1027,136 @@ def handle_session_entries(
         return _err(404, f"session not found")
     idx, prog = state.ensure_index(project_id, session_path, jsonl)
     if idx is None:
-        return _json_response({"indexing": True}, status=202)
+        return _json_bytes_response(_INDEXING_BODY, status=202)
 
     entries = idx.get("entries", [])
     total = len(entries)
-    out: list[dict[str, Any]] = []
-    with jsonl.open("rb") as f:
-        for i in indices:
-            if i < 0 or i >= total:
-                continue
-            e = entries[i]
-            offset = e["offset"]
-            size = e["size"]
-            f.seek(offset)
-            raw = f.read(size)
-            try:
-                parsed = json.loads(raw)
-            except (json.JSONDecodeError, UnicodeDecodeError) as parse_err:
-                parsed = {"_unparseable": True, "_error": str(parse_err)}
-            out.append({"idx": i, "entry": parsed})
-    return _json_response({"entries": out})
+    wanted = [i for i in indices if 0 <= i < total]
+    # Check before answering so a vanished file is still a clean 404. The
+    # body generator opens the file itself, so an fd never outlives a
+    # generator the server didn't get round to running.
+    try:
+        jsonl.stat()
+    except OSError:
+        return _err(404, "session not found")
+    headers = {
+        "Content-Type": "application/json; charset=utf-8",
+        "Cache-Control": "no-store",
+    }
+    return (200, headers, _iter_entries_json(
+        jsonl, entries, wanted, idx.get("file_size", 0),
+    ))
+
+
+def _iter_entries_json(
+    jsonl: Path, entries: list[dict[str, Any]], indices: list[int],
+    indexed_size: int,
+) -> Iterator[bytes]:
+    """
+    Yield {"entries": [{"idx", "entry"}, ...]} piecewise. Huge tool results
+    make single entries multi-MB; the client starts receiving the first one
+    while later ones are still being read. A file that vanished since the
+    handler checked it yields an empty list.
+
+    While the file is at least `indexed_size` bytes, a line the indexer
+    found to be a strict JSON object is copied into the response as is: it
+    already is the JSON the client wants, so parsing and re-encoding it
+    would only cost time and two extra copies of the entry. Anything else (malformed lines, several objects on
+    one line, NaN or a BOM that only the stdlib accepts) goes through
+    json.loads and is re-encoded, so bad lines still come back as
+    _unparseable.
+    """
+    try:
+        f = jsonl.open("rb")
+    except OSError:
+        yield b'{"entries":[]}'
+        return
+    with f:
+        # Session logs only ever grow; a file shorter than its index was
+        # rewritten, and its recorded offsets may land mid-line.
+        splice = os.fstat(f.fileno()).st_size >= indexed_size
+        yield b'{"entries":['
+        sep = b""
+        for run in _read_runs(entries, indices):
+            start = entries[run[0]]["offset"]
+            f.seek(start)
+            buf = f.read(entries[run[-1]]["offset"] + entries[run[-1]]["size"] - start)
+            for i in run:
+                e = entries[i]
+                lo = e["offset"] - start
+                raw = buf[lo:lo + e["size"]]
+                if splice and e.get("splice") and raw.endswith(b"\n"):
+                    yield b'%b{"idx":%d,"entry":%b}' % (sep, i, raw[:-1])
+                else:
+                    try:
+                        parsed = json.loads(raw)
+                    except (json.JSONDecodeError, UnicodeDecodeError) as parse_err:
+                        parsed = {"_unparseable": True, "_error": str(parse_err)}
+                    yield sep + _encode_json({"idx": i, "entry": parsed})
+                sep = b","
+        yield b"]}"
+
+
+def _read_runs(entries: list[dict[str, Any]], indices: list[int]) -> Iterator[list[int]]:
+    """
+    Split `indices` (in request order) into runs that one read() can serve:
+    each next entry starts at or after the previous one's end, and the run's
+    byte span stays within ENTRIES_READ_SPAN. The detail pane asks for an
+    entry plus its neighbours, which are usually adjacent lines.
+    """
+    run: list[int] = []
+    start = end = 0
+    for i in indices:
+        e = entries[i]
+        off, size = e["offset"], e["size"]
+        if run and off >= end and off + size - start <= ENTRIES_READ_SPAN:
+            run.append(i)
+            end = off + size
+            continue
+        if run:
+            yield run
+        run = [i]
+        start, end = off, off + size
+    if run:
+        yield run
 
 
 def handle_blob(
     state: AppState, project_id: str, session_path: str, kind: str, name: str,
-) -> tuple[int, dict[str, str], bytes]:
+    if_none_match: str | None = None, accept_gzip: bool = False,
+) -> tuple[int, dict[str, str], bytes | Path]:
     project_id = urllib.parse.unquote(project_id)
     session_path = urllib.parse.unquote(session_path)
     if kind != "tool-results":
         return _err(404, f"unknown blob kind {kind!r}")
-    project_dir = state.projects_root / project_id
-    if not project_dir.exists():
-        return _err(404, "project not found")
-    if "/" in session_path:
-        # Subagents share parent's tool-results dir.
-        parent_session = session_path.split("/", 1)[0]
-    else:
-        parent_session = session_path
-    blob_path = project_dir / parent_session / "tool-results" / name
-    try:
-        blob_path.resolve().relative_to(project_dir.resolve())
-    except ValueError:
+    m = _SESSION_PATH_RE.fullmatch(session_path)
+    if m is None or not _NAME_RE.fullmatch(project_id) or not _NAME_RE.fullmatch(name):
         return _err(404, "invalid blob path")
-    if not blob_path.exists() or not blob_path.is_file():
+    # Subagents share parent's tool-results dir.
+    blob_path = state.projects_root / project_id / m["session"] / "tool-results" / name
+    try:
+        st = blob_path.stat()
+    except OSError:
+        return _err(404, "blob not found")
+    if not stat.S_ISREG(st.st_mode):
         return _err(404, "blob not found")
-    body = blob_path.read_bytes()
+    # Blobs are written once; reopening one revalidates to a bodiless 304.
+    etag = file_etag(st)
+    if etag_matches(if_none_match, etag):
+        return (304, {"ETag": etag, "Cache-Control": "no-cache"}, b"")
     headers = {
         "Content-Type": "text/plain; charset=utf-8",
-        "Content-Length": str(len(body)),
-        "Cache-Control": "no-store",
+        "Cache-Control": "no-cache",
+        "ETag": etag,
     }
-    return (200, headers, body)
+    if st.st_size >= BLOB_GZIP_MIN_BYTES:
+        headers["Vary"] = "Accept-Encoding"
+        if accept_gzip:
+            gz_path = cache_mod.blob_gzip_path(project_id, m["session"], name)
+            if cache_mod.ensure_gzip_copy(blob_path, gz_path, st.st_mtime_ns):
+                headers["Content-Encoding"] = "gzip"
+                return (200, headers, gz_path)
+    return (200, headers, blob_path)
 
 
 # Convenience: parse query string indices=
@@ -8,15 +8,34 @@ the indexer does an incremental update starting at last_byte_offset.
 
 from __future__ import annotations
 
+import gzip
 import json
 import os
+import shutil
 import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any
 
-CACHE_SCHEMA_VERSION = 1
+CACHE_SCHEMA_VERSION = 4
 CACHE_DIR_NAME = ".cc-viewer-cache"
 
+# A directory listing memoized less than this many seconds after the
+# directory's mtime is not trusted: a file created in the same mtime tick
+# would not move the mtime again (same trick as git's "racy" index entries).
+RACY_MTIME_SECONDS = 2.0
+
+# project_dir -> (dir st_mtime_ns, session jsonl paths, session dir names)
+_sessions_memo: dict[str, tuple[int, list[Path], frozenset[str]]] = {}
+_sessions_memo_lock = threading.Lock()
+
+# Threads for --clear-cache. Deleting is syscall-latency bound (one unlink
+# per index/blob file, painful on NFS homes), not CPU bound, so this is
+# not tied to the core count.
+CLEAR_WORKERS = 16
+
 
 def projects_root() -> Path:
     """~/.claude/projects/. Override via env CC_LOG_PROJECTS_DIR."""
@@ -46,14 +65,50 @@ def cache_path(project_id: str, session_path: str) -> Path:
 
 
 def date_index_path(project_id: str) -> Path:
-    """Per-project rollup index aggregating all sessions' active dates."""
+    """
+    Per-project rollup: one indexer.summarize_index() dict per session, keyed
+    by session path, so a cold /dates request needn't load every full index.
+    """
     return cache_root() / project_id / "_dates.idx.json"
 
 
+def blob_gzip_path(project_id: str, session: str, name: str) -> Path:
+    """Gzipped copy of <project>/<session>/tool-results/<name>."""
+    return cache_root() / project_id / f"{session}__tool-results" / f"{name}.gz"
+
+
+def ensure_gzip_copy(src: Path, dest: Path, src_mtime_ns: int) -> bool:
+    """
+    Make sure `dest` holds a gzip of `src` at least as new as src_mtime_ns,
+    compressing (streamed, tmp file + os.replace) if not. Returns False if
+    it couldn't be written; the caller then serves `src` as is.
+    """
+    try:
+        if dest.stat().st_mtime_ns >= src_mtime_ns:
+            return True
+    except OSError:
+        pass
+    try:
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=dest.name, dir=dest.parent)
+    except OSError:
+        return False
+    try:
+        with os.fdopen(fd, "wb") as raw, src.open("rb") as f:
+            with gzip.GzipFile(filename="", mode="wb", fileobj=raw, compresslevel=6, mtime=0) as gz:
+                shutil.copyfileobj(f, gz, 1 << 20)
+        os.replace(tmp, dest)
+        return True
+    except OSError:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        return False
+
+
 def load_cache(path: Path) -> dict[str, Any] | None:
     """Read cache JSON, return None if missing or invalid."""
-    if not path.exists():
-        return None
     try:
         with path.open("r", encoding="utf-8") as f:
             data = json.load(f)
@@ -81,6 +136,44 @@ def save_cache(path: Path, data: dict[str, Any]) -> None:
         raise
 
 
+def clear_cache() -> bool:
+    """
+    Delete the whole cache directory (indexes are rebuilt on demand).
+    Returns False if it didn't exist.
+
+    A big cache is thousands of small files, and a serial rmtree pays one
+    unlink round trip per file, so the unlinks are spread over a thread
+    pool and only the (few) directories are removed serially afterwards.
+    """
+    root = cache_root()
+    if not root.is_dir():
+        return False
+    files: list[str] = []
+    dirs: list[str] = []
+    # Bottom-up, so every directory comes after its children.
+    for dirpath, _, filenames in os.walk(root, topdown=False):
+        files.extend(os.path.join(dirpath, f) for f in filenames)
+        dirs.append(dirpath)
+    if files:
+        with ThreadPoolExecutor(max_workers=min(CLEAR_WORKERS, len(files))) as ex:
+            list(ex.map(_unlink_quiet, files))
+    for d in dirs:
+        try:
+            os.rmdir(d)
+        except OSError:
+            pass
+    # Anything the walk could not see (or that appeared meanwhile).
+    shutil.rmtree(root, ignore_errors=True)
+    return True
+
+
+def _unlink_quiet(path: str) -> None:
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
 def is_cache_valid(cache: dict[str, Any] | None, jsonl_path: Path) -> tuple[bool, bool]:
     """
     Decide whether to reuse, incrementally extend, or rebuild the cache.
@@ -90,7 +183,7 @@ def is_cache_valid(cache: dict[str, Any] | None, jsonl_path: Path) -> tuple[bool
       can_extend   = True  -> cache is stale-but-appendable; resume from last_byte_offset
       both False   = drop cache, rebuild from scratch
     """
-    if cache is None or not jsonl_path.exists():
+    if cache is None:
         return False, False
 
     try:
@@ -126,16 +219,17 @@ def discover_projects(root: Path | None = None) -> list[Path]:
     and any files). Skip the on-disk cache directory and other dotted dirs.
     """
     root = root or projects_root()
-    if not root.exists():
+    try:
+        with os.scandir(root) as it:
+            # is_dir() answers from the dirent type; no stat per entry.
+            names = [
+                e.name for e in it
+                if not e.name.startswith(".") and e.is_dir()
+            ]
+    except OSError:
         return []
-    out: list[Path] = []
-    for entry in sorted(root.iterdir()):
-        if not entry.is_dir():
-            continue
-        if entry.name.startswith(".") or entry.name == CACHE_DIR_NAME:
-            continue
-        out.append(entry)
-    return out
+    names.sort()
+    return [root / n for n in names]
 
 
 def discover_sessions(project_dir: Path) -> list[Path]:
@@ -144,16 +238,57 @@ def discover_sessions(project_dir: Path) -> list[Path]:
 
     Subagent jsonls live under <session>/subagents/agent-*.jsonl and are
     discovered separately by the indexer (per-session).
+
+    The listing is memoized per directory mtime: creating, deleting or
+    renaming a session file bumps it, appending to one does not, so repeat
+    calls cost a single stat() instead of a directory read.
     """
-    if not project_dir.exists():
-        return []
-    out: list[Path] = []
-    for entry in sorted(project_dir.iterdir()):
-        if entry.is_file() and entry.suffix == ".jsonl":
-            stem = entry.stem
-            # Validate UUID-ish name (skip oddities), but be permissive.
-            if len(stem) >= 8:
-                out.append(entry)
+    listing = scan_project(project_dir)
+    return list(listing[0]) if listing is not None else []
+
+
+def is_session_jsonl_name(name: str) -> bool:
+    """
+    Whether a file directly in a project dir counts as a session log. Shared
+    with the watcher so its project mtimes cover exactly the listed files.
+    """
+    # Validate UUID-ish name (skip oddities), but be permissive.
+    return name.endswith(".jsonl") and len(name) >= 14
+
+
+def scan_project(project_dir: Path) -> tuple[list[Path], frozenset[str]] | None:
+    """
+    (session jsonls, session dir names) from one memoized directory read,
+    or None when the project dir is missing. Callers needing both, or an
+    existence check, pay a single stat() instead of one per question.
+    The list is shared with the memo; don't mutate it.
+    """
+    try:
+        st = project_dir.stat()
+    except OSError:
+        return None
+    key = str(project_dir)
+    with _sessions_memo_lock:
+        memo = _sessions_memo.get(key)
+    if memo is not None and memo[0] == st.st_mtime_ns:
+        return (memo[1], memo[2])
+    names: list[str] = []
+    dirs: set[str] = set()
+    try:
+        with os.scandir(project_dir) as it:
+            for entry in it:
+                name = entry.name
+                if entry.is_dir():
+                    dirs.add(name)
+                elif is_session_jsonl_name(name) and entry.is_file():
+                    names.append(name)
+    except OSError:
+        return None
+    names.sort()
+    out = ([project_dir / n for n in names], frozenset(dirs))
+    if time.time() - st.st_mtime > RACY_MTIME_SECONDS:
+        with _sessions_memo_lock:
+            _sessions_memo[key] = (st.st_mtime_ns, *out)
     return out
 
 
@@ -167,13 +302,16 @@ def discover_subagents(session_dir: Path) -> list[Path]:
     just need a yes/no answer should use has_subagents() instead.
     """
     sub = session_dir / "subagents"
-    if not sub.is_dir():
+    try:
+        with os.scandir(sub) as it:
+            names = [
+                e.name for e in it
+                if e.name.startswith("agent-") and e.name.endswith(".jsonl") and e.is_file()
+            ]
+    except OSError:
         return []
-    out: list[Path] = []
-    for entry in sorted(sub.iterdir()):
-        if entry.is_file() and entry.suffix == ".jsonl" and entry.name.startswith("agent-"):
-            out.append(entry)
-    return out
+    names.sort()
+    return [sub / n for n in names]
 
 
 def has_subagents(session_dir: Path) -> bool:
@@ -183,12 +321,10 @@ def has_subagents(session_dir: Path) -> bool:
     caller actually needs the file list.
     """
     sub = session_dir / "subagents"
-    if not sub.is_dir():
-        return False
-    # Try a single iterdir() call but break on the first hit. iterdir is a
-    # generator, so this is O(1) on most filesystems.
+    # One scandir() that stops at the first hit; a missing dir raises, so
+    # no separate is_dir() probe.
     try:
-        with os.scandir(str(sub)) as it:
+        with os.scandir(sub) as it:
             for entry in it:
                 if entry.name.startswith("agent-") and entry.name.endswith(".jsonl"):
                     return True
@@ -199,7 +335,8 @@ def has_subagents(session_dir: Path) -> bool:
 
 def discover_tool_result_blobs(session_dir: Path) -> list[str]:
     """Filenames inside <session>/tool-results/ (referenced by inline content)."""
-    tr = session_dir / "tool-results"
-    if not tr.is_dir():
+    try:
+        with os.scandir(session_dir / "tool-results") as it:
+            return sorted(e.name for e in it if e.is_file())
+    except OSError:
         return []
-    return sorted(p.name for p in tr.iterdir() if p.is_file())
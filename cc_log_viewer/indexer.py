@@ -7,9 +7,11 @@ preview per entry. The full entry content is never loaded into memory at
 indexing time; serving full content is on-demand via byte offset.
 
 Design:
-- Single-pass over the file, iterating by lines (handles >100MB safely with
-  Python file iteration; no mmap needed because we always need byte offsets
-  *between* lines and tell()/readline cooperate cleanly).
+- Single pass over the file. Lines are found with find(b"\\n") in a
+  read-only mmap, which yields byte offsets directly and never copies
+  oversized lines. Files that can't be mapped, and files that shrink while
+  being scanned (a mapped page past EOF would SIGBUS), are read with
+  readline() instead.
 - json.loads each line; recoverable ValueError -> skip the line and continue.
 - For lines >1MB, skip preview extraction but still record the offset.
 - Append-only incremental update: when extending, seek to last_byte_offset and
@@ -19,23 +21,40 @@ Design:
 
 from __future__ import annotations
 
+import functools
 import json
+import mmap
 import os
+import re
 import threading
 from pathlib import Path
-from typing import Any, Iterable
+from typing import Any, BinaryIO, Iterable, Iterator
 
 from . import cache as cache_mod
 from . import dates as dates_mod
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 
 # Per-line size cap above which we still record offset but skip JSON parse for
 # preview/header. 1 MB is generous; the largest line we've seen is ~362KB.
 HUGE_LINE_BYTES = 1 << 20
 
+# _iter_lines() re-checks the file size this often while scanning a mapping,
+# so a log truncated mid-scan is noticed before a page past EOF is touched.
+MMAP_RECHECK_BYTES = 1 << 20
+
 # Preview character cap.
 PREVIEW_CHARS = 200
 
+# Whitespace-delimited "tool-results/<hash>" references inside tool_result
+# content. Compiled once; the indexer runs this over every tool_result block.
+_TOOL_RESULT_REF_RE = re.compile(r"(?<!\S)tool-results/\S*")
+
 # Types that have visible roles by default in the UI.
 CONVERSATION_TYPES = frozenset({"user", "assistant"})
 
@@ -48,6 +67,109 @@ META_TYPES = frozenset({
 })
 
 
+def _json_loads(raw: bytes) -> Any:
+    """
+    json.loads on a raw jsonl line. Uses orjson when installed (parses bytes
+    directly, several times faster); anything orjson rejects is retried with
+    the stdlib so the two paths accept exactly the same input.
+    """
+    if HAS_ORJSON:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(raw)
+
+
+# Tokens the stdlib parser accepts but JSON (and the browser's JSON.parse)
+# does not. Matched anywhere in the line, so a string that merely contains
+# the word only costs that line its splice.
+_NON_JSON_RE = re.compile(rb"NaN|Infinity")
+
+
+def _json_loads_checked(raw: bytes) -> tuple[Any, bool]:
+    """
+    _json_loads() plus whether `raw` itself is strict JSON that a browser
+    would accept verbatim. orjson is strict (UTF-8 only, no BOM, no
+    NaN/Infinity); the stdlib also takes NaN/Infinity and BOM-prefixed or
+    UTF-16/32 input, so a line only it parses is checked for those.
+    """
+    if HAS_ORJSON:
+        try:
+            return orjson.loads(raw), True
+        except orjson.JSONDecodeError:
+            # Whatever the stdlib makes of it is not strict JSON.
+            return json.loads(raw), False
+    parsed = json.loads(raw)
+    strict = (raw[:1] == b"{" and b"\x00" not in raw
+              and _NON_JSON_RE.search(raw) is None)
+    return parsed, strict
+
+
+def _iter_lines(
+    f: BinaryIO, start: int, end: int,
+) -> Iterator[tuple[int, int, bytes | None]]:
+    """
+    Yield (byte_offset, size, raw_line) for [start, end) of an open binary file.
+
+    Lines are located in a read-only mmap of the first `end` bytes with
+    find(b"\\n"): no per-readline buffer refills, and lines longer than
+    HUGE_LINE_BYTES are never copied out of the mapping (raw_line is None;
+    callers only record their size). Falls back to plain readline() when
+    the file can't be mapped (empty files, some special filesystems).
+
+    Touching a mapped page past EOF raises SIGBUS, which kills the process,
+    and logs do get truncated or rewritten. So the file size is re-checked
+    with fstat() before the scan enters each MMAP_RECHECK_BYTES window; if
+    the file has shrunk below `end`, the rest is read with readline(),
+    which just sees a short read.
+    """
+    if end > start:
+        try:
+            mm = mmap.mmap(f.fileno(), end, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            mm = None
+        if mm is not None:
+            with mm:
+                fd = f.fileno()
+                line = scan = checked = start
+                while line < end:
+                    if scan >= checked:
+                        if os.fstat(fd).st_size < end:
+                            break
+                        checked = scan + MMAP_RECHECK_BYTES
+                    window = min(end, checked)
+                    nl = mm.find(b"\n", scan, window)
+                    if nl < 0 and window < end:
+                        # The line runs on into the next window.
+                        scan = window
+                        continue
+                    stop = window if nl < 0 else nl + 1
+                    size = stop - line
+                    yield line, size, (mm[line:stop] if size <= HUGE_LINE_BYTES else None)
+                    line = scan = stop
+                else:
+                    return
+            start = line
+    yield from _readline_lines(f, start, end)
+
+
+def _readline_lines(
+    f: BinaryIO, start: int, end: int,
+) -> Iterator[tuple[int, int, bytes | None]]:
+    """_iter_lines() without mmap."""
+    f.seek(start)
+    while True:
+        offset = f.tell()
+        if offset >= end:
+            return
+        raw = f.readline()
+        if not raw:
+            return
+        size = len(raw)
+        yield offset, size, (raw if size <= HUGE_LINE_BYTES else None)
+
+
 class Progress:
     """
     Thread-safe progress reporter for the indexer.
@@ -55,6 +177,13 @@ class Progress:
     The HTTP handler instantiates one of these per (project_id, session_path)
     pair on first access and the indexer thread updates it line-by-line.
     """
+    # AppState holds one per index run in flight and drops it once the run
+    # succeeds (a failed run's stays, to report the error). A cold start
+    # can have every session of a project in flight at once; slots keep
+    # them small and the snapshot() attribute loads cheap.
+    __slots__ = ("_lock", "total_bytes", "bytes_done", "lines_done",
+                 "complete", "error")
+
     def __init__(self, total_bytes: int):
         self._lock = threading.Lock()
         self.total_bytes = max(total_bytes, 1)
@@ -137,6 +266,7 @@ def _extract_header(parsed: dict[str, Any]) -> dict[str, Any]:
             for blk in content:
                 if not isinstance(blk, dict):
                     continue
+                result_text: str | None = None
                 bt = blk.get("type")
                 if bt:
                     kinds_seen.append(bt)
@@ -150,16 +280,21 @@ def _extract_header(parsed: dict[str, Any]) -> dict[str, Any]:
                         tn = blk.get("name") or ""
                         preview = f"[tool_use:{tn}] " + _coerce_str(blk.get("input"))[:PREVIEW_CHARS - 12]
                     elif bt == "tool_result":
-                        preview = "[tool_result] " + _coerce_str(blk.get("content"))[:PREVIEW_CHARS - 14]
+                        result_text = _coerce_str(blk.get("content"))
+                        preview = "[tool_result] " + result_text[:PREVIEW_CHARS - 14]
                 # Take the first tool name we see.
                 if tool_name is None and bt == "tool_use":
                     tool_name = blk.get("name") or None
                 # Collect tool-result blob references from inline content.
                 if bt == "tool_result":
-                    raw = _coerce_str(blk.get("content"))
-                    # Look for "tool-results/<hash>" references.
-                    for token in raw.split():
-                        if token.startswith("tool-results/"):
+                    # Reuse the coercion from the preview branch when it ran:
+                    # list content means a json.dumps of the whole result.
+                    raw = result_text if result_text is not None else _coerce_str(blk.get("content"))
+                    result_text = None
+                    # Look for "tool-results/<hash>" references. The substring
+                    # test skips the regex scan for the common no-blob case.
+                    if "tool-results/" in raw:
+                        for token in _TOOL_RESULT_REF_RE.findall(raw):
                             cleaned = token.rstrip(":,;)")
                             if cleaned not in ext_blobs:
                                 ext_blobs.append(cleaned)
@@ -237,44 +372,88 @@ def _classify_for_filter(header: dict[str, Any]) -> str:
     return "other"
 
 
+# One-char code per filter class; matches FILTER_LABELS in app.js. Indexes
+# store one code per entry ("filter_classes") so requests never re-classify.
+FILTER_CODES = {
+    "user": "u", "assistant_text": "a", "assistant_tool": "t",
+    "tool_result": "r", "assistant_thinking": "T",
+    "compact_summary": "c", "command_inject": "C",
+    "meta": "m", "other": "o",
+}
+FILTER_CLASSES_BY_CODE = {v: k for k, v in FILTER_CODES.items()}
+
+
+def filter_codes(idx: dict[str, Any]) -> str:
+    """
+    The index's per-entry filter code string. Indexes written before it was
+    stored get it computed once here and kept on the in-memory dict.
+    """
+    codes = idx.get("filter_classes")
+    if codes is None or len(codes) != len(idx.get("entries") or ()):
+        codes = "".join(
+            FILTER_CODES[_classify_for_filter(e)] for e in idx.get("entries") or ()
+        )
+        idx["filter_classes"] = codes
+    return codes
+
+
 def _index_jsonl(
     jsonl_path: Path,
     tz,
     progress: Progress | None = None,
     start_offset: int = 0,
-    seed_index: list[dict[str, Any]] | None = None,
+    seed: dict[str, Any] | None = None,
 ) -> dict[str, Any]:
     """
     Scan jsonl_path from start_offset to EOF, return a fresh index dict.
 
-    If seed_index is given (incremental update), the new entries are appended
-    onto a copy of seed_index. Caller is responsible for ensuring start_offset
-    matches a line boundary (always true if it came from a prior cache).
+    If seed (a prior index of the same file) is given, this is an incremental
+    update: new entries are appended onto a copy of seed's entries. Caller is
+    responsible for ensuring start_offset matches a line boundary (always
+    true if it came from a prior cache). The rollups (type_breakdown,
+    by_date, compact_indices) are carried over from seed and only the new
+    lines are folded in, so a live session's re-index costs O(appended
+    lines); by_date is rebuilt in full only if seed was built in another tz.
+
+    The session label is picked up in the same pass (see _label_from_entry),
+    so listing a project never has to re-open its jsonl files.
     """
-    entries: list[dict[str, Any]] = list(seed_index) if seed_index else []
-    bin_filter: dict[str, int] = {}
-    if seed_index:
+    seed_entries = (seed.get("entries") or []) if seed else []
+    entries: list[dict[str, Any]] = list(seed_entries)
+    label = (seed.get("label") or "") if seed else ""
+    tz_label = dates_mod.tz_name(tz)
+    if seed and "type_breakdown" in seed:
+        bin_filter: dict[str, int] = dict(seed["type_breakdown"])
+    else:
         # Replay class counts from seeded entries so type_breakdown is right.
-        for h in seed_index:
+        bin_filter = {}
+        for h in seed_entries:
             cls = _classify_for_filter(h)
             bin_filter[cls] = bin_filter.get(cls, 0) + 1
+    # Per-entry filter codes: the seed's, then one appended per new line.
+    codes: list[str] = [filter_codes(seed)] if seed else []
+    # by_date / compact_indices are extended from this entry index on.
+    if seed and seed.get("tz") == tz_label and "by_date" in seed:
+        by_date: dict[str, list[int]] = {d: list(ix) for d, ix in seed["by_date"].items()}
+        compact_indices: list[int] = list(seed.get("compact_indices") or [])
+        rollup_from = len(seed_entries)
+    else:
+        by_date = {}
+        compact_indices = []
+        rollup_from = 0
 
-    file_size = jsonl_path.stat().st_size
     bytes_done = start_offset
     lines_done = len(entries)
 
-    PROGRESS_STEP = max(1024 * 64, file_size // 200) if file_size else 1
-    next_progress_at = bytes_done + PROGRESS_STEP
-
     with jsonl_path.open("rb") as f:
-        if start_offset:
-            f.seek(start_offset)
-        while True:
-            line_offset = f.tell()
-            raw = f.readline()
-            if not raw:
-                break
-            line_size = len(raw)
+        # One fstat for the whole scan: we index exactly st_size bytes and
+        # record that size, so lines appended mid-scan are picked up by the
+        # next incremental pass instead of being skipped over.
+        st = os.fstat(f.fileno())
+        file_size = st.st_size
+        PROGRESS_STEP = max(1024 * 64, file_size // 200) if file_size else 1
+        next_progress_at = bytes_done + PROGRESS_STEP
+        for line_offset, line_size, raw in _iter_lines(f, start_offset, file_size):
             entry: dict[str, Any] = {
                 "offset": line_offset,
                 "size": line_size,
@@ -282,32 +461,38 @@ def _index_jsonl(
                 "isSidechain": False, "isCompactSummary": False, "forkedFrom": None,
                 "role": None, "kind": "", "tool_name": None, "preview": "",
                 "ext_blobs": None,
+                # The line is a strict JSON object as-is; /entries may
+                # splice it into its response without re-encoding.
+                "splice": False,
             }
-            if line_size <= HUGE_LINE_BYTES:
+            if raw is not None:
                 try:
-                    parsed = json.loads(raw)
+                    parsed, strict = _json_loads_checked(raw)
                 except (json.JSONDecodeError, UnicodeDecodeError):
-                    parsed = None
+                    parsed, strict = None, False
                 if isinstance(parsed, dict):
                     header = _extract_header(parsed)
                     entry.update(header)
+                    entry["splice"] = strict
+                    if not label and len(entries) < LABEL_SCAN_LINES:
+                        label = _label_from_entry(parsed)
             else:
                 # Huge line: stamp size only, no preview.
                 entry["preview"] = f"[huge line: {line_size:,} bytes]"
             entries.append(entry)
             cls = _classify_for_filter(entry)
             bin_filter[cls] = bin_filter.get(cls, 0) + 1
+            codes.append(FILTER_CODES[cls])
             lines_done += 1
             bytes_done = line_offset + line_size
             if progress is not None and bytes_done >= next_progress_at:
                 progress.update(bytes_done, lines_done)
                 next_progress_at = bytes_done + PROGRESS_STEP
 
-    # Build by-date index in the chosen TZ.
-    by_date: dict[str, list[int]] = {}
-    compact_indices: list[int] = []
+    # Extend the by-date index (in the chosen TZ) over the entries it lacks.
     fork: str | None = None
-    for i, e in enumerate(entries):
+    for i in range(rollup_from, len(entries)):
+        e = entries[i]
         if e.get("isCompactSummary"):
             compact_indices.append(i)
         d = dates_mod.local_date(e["ts"], tz) if e.get("ts") else None
@@ -318,22 +503,24 @@ def _index_jsonl(
 
     day_map = dates_mod.day_n_of_m(by_date.keys())
 
-    st = jsonl_path.stat()
     if progress is not None:
-        progress.update(st.st_size, lines_done)
+        progress.update(bytes_done, lines_done)
 
     return {
         "schema_version": cache_mod.CACHE_SCHEMA_VERSION,
-        "file_size": st.st_size,
+        "file_size": bytes_done,
         "file_mtime": st.st_mtime,
-        "last_byte_offset": st.st_size,
+        "last_byte_offset": bytes_done,
         "num_lines": lines_done,
         "entries": entries,
         "by_date": by_date,
         "day_map": {d: list(t) for d, t in day_map.items()},
         "type_breakdown": bin_filter,
+        "filter_classes": "".join(codes),
         "compact_indices": compact_indices,
         "fork": fork,
+        "label": label,
+        "tz": tz_label,
     }
 
 
@@ -355,17 +542,20 @@ def index_session(
     reusable, can_extend = cache_mod.is_cache_valid(cache, jsonl_path)
 
     if reusable and cache is not None:
-        if progress is not None:
-            progress.finish()
-        return cache
+        if cache.get("tz") == dates_mod.tz_name(tz):
+            if progress is not None:
+                progress.finish()
+            return cache
+        # Same bytes, other display tz: an empty incremental pass rebuilds
+        # by_date without re-parsing a single line.
+        can_extend = True
 
     if can_extend and cache is not None:
         try:
-            seed_idx = cache.get("entries") or []
             start = cache.get("last_byte_offset") or 0
             new_idx = _index_jsonl(
                 jsonl_path, tz, progress=progress,
-                start_offset=start, seed_index=seed_idx,
+                start_offset=start, seed=cache,
             )
             cache_mod.save_cache(cpath, new_idx)
             if progress is not None:
@@ -382,11 +572,37 @@ def index_session(
     return new_idx
 
 
+def summarize_index(idx: dict[str, Any]) -> dict[str, Any]:
+    """
+    The small slice of a session index that the project date rollup needs.
+
+    A full index carries one entry per jsonl line (tens of MB for big
+    sessions); the summary is a few hundred bytes, so a whole project's
+    worth can be persisted and reloaded without touching the full indexes.
+    by_date is reduced to date -> [count, first_idx, last_idx].
+    """
+    return {
+        "file_size": idx.get("file_size", -1),
+        "file_mtime": idx.get("file_mtime", -1.0),
+        "num_lines": idx.get("num_lines", 0),
+        "label": idx.get("label") or "",
+        "fork": idx.get("fork"),
+        "type_breakdown": idx.get("type_breakdown", {}),
+        "day_map": idx.get("day_map") or {},
+        "date_spans": {
+            d: [len(lines), lines[0] if lines else 0, lines[-1] if lines else 0]
+            for d, lines in (idx.get("by_date") or {}).items()
+        },
+    }
+
+
 def aggregate_project_dates(
     project_id: str, project_dir: Path, tz, indexes: Iterable[dict[str, Any]],
 ) -> dict[str, Any]:
     """
-    Combine the per-session by_date maps into a project-level rollup.
+    Combine the per-session date spans into a project-level rollup.
+
+    Each record carries a summarize_index() dict under "__summary".
 
     Color assignment: each session's hue is computed via _color_index(session_path)
     initially, but we run a greedy pass to ensure no two sessions in the same
@@ -418,20 +634,21 @@ def aggregate_project_dates(
 
     for entry in indexes:
         spath = entry["__session_path"]
-        idx = entry["__index"]
+        summary = entry["__summary"]
         label = entry.get("__label") or ""
         has_subs = entry.get("__has_subagents", False)
         color_idx = color_assignment.get(spath, _color_index(spath))
-        day_map = idx.get("day_map") or {}
-        for d, lines in idx.get("by_date", {}).items():
+        day_map = summary.get("day_map") or {}
+        spans = summary.get("date_spans") or {}
+        for d, (count, first, last) in spans.items():
             n, total = day_map.get(d, (1, 1))
             row = {
                 "session_path": spath,
                 "color_idx": color_idx,
                 "label": label,
-                "count": len(lines),
-                "first_idx_on_date": lines[0] if lines else 0,
-                "last_idx_on_date": lines[-1] if lines else 0,
+                "count": count,
+                "first_idx_on_date": first,
+                "last_idx_on_date": last,
                 "day_n": n,
                 "day_total": total,
                 "has_subagents": has_subs,
@@ -439,11 +656,11 @@ def aggregate_project_dates(
             rolled.setdefault(d, []).append(row)
         session_meta[spath] = {
             "label": label, "color_idx": color_idx,
-            "day_total": idx.get("day_map") and len(idx["day_map"]) or 0,
-            "active_dates": sorted(idx.get("by_date", {}).keys()),
-            "fork": idx.get("fork"),
-            "type_breakdown": idx.get("type_breakdown", {}),
-            "num_lines": idx.get("num_lines", 0),
+            "day_total": len(day_map),
+            "active_dates": sorted(spans.keys()),
+            "fork": summary.get("fork"),
+            "type_breakdown": summary.get("type_breakdown", {}),
+            "num_lines": summary.get("num_lines", 0),
             "has_subagents": has_subs,
         }
     sorted_dates = sorted(rolled.keys(), reverse=True)
@@ -492,6 +709,12 @@ _NOISE_PREFIXES = (
 )
 _LABEL_NOISE_PREFIXES = _NOISE_PREFIXES  # back-compat alias
 
+# All of _is_command_like_text() as one anchored pattern: leading whitespace,
+# then a noise prefix or a "# /<name>" slash-skill heading.
+_COMMAND_LIKE_RE = re.compile(
+    r"\s*(?:" + "|".join(re.escape(p) for p in _NOISE_PREFIXES) + r"|# /\w)"
+)
+
 
 def _is_command_like_text(text: str) -> bool:
     """Detect that a user-type entry is a command/system injection, not real
@@ -506,60 +729,98 @@ def _is_command_like_text(text: str) -> bool:
     """
     if not text:
         return False
-    s = text.lstrip()
-    if not s:
-        return False
-    if any(s.startswith(p) for p in _NOISE_PREFIXES):
-        return True
-    # Slash skill body templates: "# /<alnum>" markdown heading.
-    if s.startswith("# /") and len(s) > 3 and (s[3].isalnum() or s[3] == "_"):
-        return True
-    return False
+    return _COMMAND_LIKE_RE.match(text) is not None
+
+
+# Session labels come from the first real user prompt within this many lines.
+LABEL_SCAN_LINES = 80
+# Memoized derive_session_label() results (one per session file version).
+LABEL_CACHE_MAX = 1024
+LABEL_CHARS = 60
+
+
+def _label_from_entry(d: dict[str, Any], max_chars: int = LABEL_CHARS) -> str:
+    """
+    Label text if this parsed jsonl entry is a real human prompt, else "".
+    Skips slash-command markup, system tags, and task-notification injects.
+    """
+    if d.get("type") != "user" or d.get("isMeta"):
+        return ""
+    msg = d.get("message")
+    if not isinstance(msg, dict):
+        return ""
+    content = msg.get("content")
+    txt = None
+    if isinstance(content, str):
+        txt = content
+    elif isinstance(content, list):
+        for blk in content:
+            if isinstance(blk, dict) and blk.get("type") == "text":
+                txt = blk.get("text")
+                break
+    if not txt or not isinstance(txt, str):
+        return ""
+    stripped = txt.strip()
+    if not stripped:
+        return ""
+    if any(stripped.startswith(p) for p in _LABEL_NOISE_PREFIXES):
+        return ""
+    return _one_line(stripped, max_chars)
 
 
-def derive_session_label(jsonl_path: Path, max_chars: int = 60) -> str:
+def _one_line(text: str, max_chars: int) -> str:
     """
-    Read up to the first ~80 lines and return the first real user prompt as a
-    human-friendly session label. Skips slash-command markup, system tags, and
-    task-notification injected messages.
+    Whitespace-collapsed prefix of `text`, at most max_chars long.
+
+    Only a window a little past max_chars is split, widening it when runs
+    of whitespace eat the budget, so a pasted 100KB first message costs the
+    same as a short one.
     """
-    if not jsonl_path.exists():
+    window = max_chars * 2
+    while True:
+        head = text[:window]
+        line = " ".join(head.split())
+        if len(line) >= max_chars or len(head) == len(text):
+            return line[:max_chars]
+        window *= 4
+
+
+def derive_session_label(jsonl_path: Path, max_chars: int = LABEL_CHARS) -> str:
+    """
+    Read up to the first LABEL_SCAN_LINES lines and return the first real user
+    prompt as a human-friendly session label.
+
+    Indexed sessions carry the same label in their index ("label"); this is
+    the fallback for sessions still being indexed. Results are memoized on
+    (path, mtime, size), so repeated /dates polls cost one stat.
+    """
+    try:
+        st = jsonl_path.stat()
+    except OSError:
         return ""
+    return _label_for(str(jsonl_path), st.st_mtime_ns, st.st_size, max_chars)
+
+
+@functools.lru_cache(maxsize=LABEL_CACHE_MAX)
+def _label_for(path: str, mtime_ns: int, size: int, max_chars: int) -> str:
+    """derive_session_label() body; the stat fields are only cache keys."""
     try:
-        with jsonl_path.open("rb") as f:
-            for _ in range(80):
-                raw = f.readline()
-                if not raw:
+        with open(path, "rb") as f:
+            lines = _iter_lines(f, 0, os.fstat(f.fileno()).st_size)
+            for n, (_, _, raw) in enumerate(lines):
+                if n >= LABEL_SCAN_LINES:
                     break
-                if len(raw) > HUGE_LINE_BYTES:
+                if raw is None:
                     continue
                 try:
-                    d = json.loads(raw)
+                    d = _json_loads(raw)
                 except (json.JSONDecodeError, UnicodeDecodeError):
                     continue
-                if d.get("type") != "user" or d.get("isMeta"):
-                    continue
-                msg = d.get("message")
-                if not isinstance(msg, dict):
-                    continue
-                content = msg.get("content")
-                txt = None
-                if isinstance(content, str):
-                    txt = content
-                elif isinstance(content, list):
-                    for blk in content:
-                        if isinstance(blk, dict) and blk.get("type") == "text":
-                            txt = blk.get("text")
-                            break
-                if not txt:
-                    continue
-                stripped = txt.strip()
-                if not stripped:
-                    continue
-                if any(stripped.startswith(p) for p in _LABEL_NOISE_PREFIXES):
+                if not isinstance(d, dict):
                     continue
-                first_line = " ".join(stripped.split())
-                return first_line[:max_chars]
+                label = _label_from_entry(d, max_chars)
+                if label:
+                    return label
     except OSError:
         pass
     return ""
@@ -2,29 +2,90 @@
 ThreadingHTTPServer + URL router for the log viewer.
 
 The handler is intentionally thin: parse path, dispatch to api.py, write the
-returned bytes. Static files are served from cc_log_viewer/static/.
+returned body (bytes, a file, or a chunk iterator). Static files are served from cc_log_viewer/static/.
 """
 
 from __future__ import annotations
 
+import gzip
+import hashlib
 import mimetypes
+import os
+import queue
 import re
+import stat
+import threading
 import urllib.parse
+import zlib
+from collections import OrderedDict
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
-from typing import Any, Callable
+from typing import Any, Callable, Iterator
 
 from . import api as api_mod
 
 
 _STATIC_DIR = Path(__file__).resolve().parent / "static"
 
-_RE_PROJECT_DATES = re.compile(r"^/api/projects/(?P<id>[^/]+)/dates$")
-_RE_SESSION_BLOB = re.compile(
-    r"^/api/sessions/(?P<rest>.+)/blob/(?P<kind>[^/]+)/(?P<name>[^/]+)$"
+# Gzipped copies of static text assets, keyed on (path, mtime_ns, size) so an
+# edited file is recompressed on the next request. Bounded LRU.
+GZIP_CACHE_MAX = 32
+_gzip_cache: "OrderedDict[tuple[str, int, int], bytes]" = OrderedDict()
+_gzip_lock = threading.Lock()
+
+# Gzipped API bodies that carry an ETag (/api/projects, /dates, stub pages),
+# keyed on the ETag: the same version compresses once no matter how many
+# tabs poll it. Untagged JSON is compressed per response; streamed JSON
+# (/entries) chunk by chunk. Bodies smaller than GZIP_MIN_BYTES go out
+# as-is; the header overhead eats the saving.
+GZIP_MIN_BYTES = 1024
+_etag_gzip_cache: "OrderedDict[str, bytes]" = OrderedDict()
+
+# index.html's /static/... references are rewritten to carry ?v=<content
+# hash>, so the assets themselves can be cached as immutable: the page is the
+# only thing revalidated (no-cache), and it changes whenever an asset does.
+_STATIC_REF_RE = re.compile(rb'((?:href|src)="/static/)([^"?]+)(")')
+# (paths, their (mtime_ns, size) signatures, body, gzipped body, ETag)
+_index_cache: tuple[list[Path], list, bytes, bytes, str] | None = None
+_index_lock = threading.Lock()
+# Cache-Control for ?v= asset URLs.
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+
+# ({rel path under static/: (file, Content-Type, compressible)},
+#  {static dir: mtime_ns when listed}). Only files listed here are served,
+# which doubles as the path-traversal check, so a request costs a dict
+# lookup instead of resolve() + relative_to() + guess_type(). A miss
+# rebuilds it only if one of the directories changed, so assets added
+# while running show up without every 404 paying for a walk.
+_static_manifest: tuple[dict[str, tuple[Path, str, bool]], dict[str, int]] = ({}, {})
+_static_lock = threading.Lock()
+
+# Request-handling threads. A fixed pool instead of a thread per connection
+# bounds memory and thread churn when the browser opens many connections.
+# Each open tab can pin two of them indefinitely (its /api/events stream and
+# a /dates?wait=1 long poll), so leave room for a dozen tabs plus the
+# short requests around them.
+HTTP_WORKERS = 32
+
+# Largest POST body drained to keep a keep-alive connection in sync; the
+# only POST endpoint (/api/refresh) takes no body at all.
+MAX_POST_BODY = 1 << 20
+
+# Seconds an idle keep-alive connection may sit between requests.
+KEEPALIVE_TIMEOUT = 15.0
+
+# Every parameterised API route in one alternation, so a request costs a
+# single match instead of up to four. Each branch is wrapped in a named group
+# and m.lastgroup names the route that matched. Branch order is precedence:
+# blob and entries must come before the catch-all stubs route.
+_RE_API_ROUTE = re.compile(
+    r"^/api/(?:"
+    r"(?P<dates>projects/(?P<dates_id>[^/]+)/dates)"
+    r"|(?P<blob>sessions/(?P<blob_rest>.+)/blob/(?P<kind>[^/]+)/(?P<name>[^/]+))"
+    r"|(?P<entries>sessions/(?P<entries_rest>.+)/entries)"
+    r"|(?P<stubs>sessions/(?P<stubs_rest>.+))"
+    r")$"
 )
-_RE_SESSION_ENTRIES = re.compile(r"^/api/sessions/(?P<rest>.+)/entries$")
-_RE_SESSION_STUBS = re.compile(r"^/api/sessions/(?P<rest>.+)$")
 
 
 def _split_first_slash(rest: str) -> tuple[str, str]:
@@ -34,50 +95,349 @@ def _split_first_slash(rest: str) -> tuple[str, str]:
     return (parts[0], parts[1])
 
 
+def _is_compressible(mime: str) -> bool:
+    return (mime.startswith("text/") or mime.endswith("javascript")
+            or mime.endswith("json") or mime.endswith("+xml"))
+
+
+def _accepts_gzip(accept_encoding: str | None) -> bool:
+    """True if an Accept-Encoding header allows gzip (and doesn't q=0 it)."""
+    if not accept_encoding:
+        return False
+    for tok in accept_encoding.split(","):
+        name, _, params = tok.strip().partition(";")
+        if name.strip().lower() in ("gzip", "*"):
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+def _gzipped_file(path: Path) -> bytes | None:
+    """Compressed body for a static file, from the LRU or freshly built."""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    key = (str(path), st.st_mtime_ns, st.st_size)
+    with _gzip_lock:
+        gz = _gzip_cache.get(key)
+        if gz is not None:
+            _gzip_cache.move_to_end(key)
+            return gz
+    try:
+        gz = gzip.compress(path.read_bytes(), compresslevel=6)
+    except OSError:
+        return None
+    with _gzip_lock:
+        _gzip_cache[key] = gz
+        while len(_gzip_cache) > GZIP_CACHE_MAX:
+            _gzip_cache.popitem(last=False)
+    return gz
+
+
+def _gzip_chunks(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    """
+    Gzip a streamed body on the fly. Each chunk is sync-flushed, so the
+    client can still decode the first entries before the last are read.
+    Closes `chunks` when done or abandoned.
+    """
+    z = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    try:
+        for chunk in chunks:
+            out = z.compress(chunk) + z.flush(zlib.Z_SYNC_FLUSH)
+            if out:
+                yield out
+        yield z.flush()
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+
+
+def _gzipped_etag_body(etag: str, body: bytes) -> bytes:
+    """Compressed copy of an ETagged API body, from the LRU or freshly built."""
+    with _gzip_lock:
+        gz = _etag_gzip_cache.get(etag)
+        if gz is not None:
+            _etag_gzip_cache.move_to_end(etag)
+            return gz
+    gz = gzip.compress(body, compresslevel=6)
+    with _gzip_lock:
+        _etag_gzip_cache[etag] = gz
+        while len(_etag_gzip_cache) > GZIP_CACHE_MAX:
+            _etag_gzip_cache.popitem(last=False)
+    return gz
+
+
+def _file_sigs(paths: list[Path]) -> list:
+    out = []
+    for p in paths:
+        try:
+            st = p.stat()
+            out.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            out.append(None)
+    return out
+
+
+def _versioned_index() -> tuple[bytes, bytes, str] | None:
+    """
+    index.html with content-hashed asset URLs, plus its gzip and an ETag.
+    Rebuilt when index.html or any referenced asset changes on disk.
+    """
+    global _index_cache
+    with _index_lock:
+        cached = _index_cache
+    if cached is not None and _file_sigs(cached[0]) == cached[1]:
+        return cached[2:]
+    index = _STATIC_DIR / "index.html"
+    paths = [index]
+    sigs = _file_sigs(paths)
+    try:
+        src = index.read_bytes()
+    except OSError:
+        return None
+
+    def stamp(m: re.Match) -> bytes:
+        asset = _STATIC_DIR / m.group(2).decode("utf-8")
+        asset_sig = _file_sigs([asset])
+        try:
+            digest = hashlib.blake2b(asset.read_bytes(), digest_size=6).hexdigest()
+        except OSError:
+            return m.group(0)
+        paths.append(asset)
+        sigs.extend(asset_sig)
+        return m.group(1) + m.group(2) + b"?v=" + digest.encode("ascii") + m.group(3)
+
+    body = _STATIC_REF_RE.sub(stamp, src)
+    gz = gzip.compress(body, compresslevel=6)
+    # The asset hashes are in the body, so its digest covers them too.
+    etag = f'W/"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+    with _index_lock:
+        _index_cache = (paths, sigs, body, gz, etag)
+    return (body, gz, etag)
+
+
+def _static_entry(rel: str) -> tuple[Path, str, bool] | None:
+    """Manifest lookup for /static/<rel>."""
+    global _static_manifest
+    files, dirs = _static_manifest
+    entry = files.get(rel)
+    if entry is not None:
+        return entry
+    # A miss (sourcemap probe, typo) is a plain 404 unless a directory under
+    # static/ changed since the build: a few stat()s, no walk, no lock.
+    if dirs and _dir_sigs(dirs) == dirs:
+        return None
+    with _static_lock:
+        if _static_manifest[1] is dirs:
+            _static_manifest = _build_static_manifest()
+        files = _static_manifest[0]
+    return files.get(rel)
+
+
+def _dir_sigs(dirs: dict[str, int]) -> dict[str, int]:
+    out = {}
+    for d in dirs:
+        try:
+            out[d] = os.stat(d).st_mtime_ns
+        except OSError:
+            out[d] = -1
+    return out
+
+
+def _build_static_manifest() -> tuple[dict[str, tuple[Path, str, bool]], dict[str, int]]:
+    root = _STATIC_DIR.resolve()
+    out: dict[str, tuple[Path, str, bool]] = {}
+    dirs: dict[str, int] = {}
+    for dirpath, _, filenames in os.walk(root):
+        try:
+            dirs[dirpath] = os.stat(dirpath).st_mtime_ns
+        except OSError:
+            continue
+        for name in filenames:
+            path = Path(dirpath) / name
+            target = path.resolve()
+            try:
+                target.relative_to(root)
+            except ValueError:
+                continue  # symlink out of static/
+            mime, _ = mimetypes.guess_type(name)
+            mime = mime or "application/octet-stream"
+            text = (mime.startswith("text/") or mime.endswith("javascript")
+                    or mime.endswith("json"))
+            ctype = mime + ("; charset=utf-8" if text else "")
+            out[path.relative_to(root).as_posix()] = (target, ctype, _is_compressible(mime))
+    return (out, dirs)
+
+
 def make_handler(state: api_mod.AppState) -> type:
     """Build a request-handler class bound to a single AppState."""
 
     class Handler(BaseHTTPRequestHandler):
         # http.server logs to stderr; we route via log_message below.
+        # HTTP/1.1 keeps connections open between requests, so the page's
+        # asset + API fetches reuse a few sockets instead of one per request.
         protocol_version = "HTTP/1.1"
+        # Idle keep-alive sockets give their worker back after this long, so
+        # a parked browser tab can't pin the pool.
+        timeout = KEEPALIVE_TIMEOUT
+        # Responses are mostly small JSON written as header + body; with
+        # Nagle on, the body can sit behind a delayed ACK for ~40ms.
+        disable_nagle_algorithm = True
 
         # --- helpers ----------------------------------------------------
 
-        def _write(self, status: int, headers: dict[str, str], body: bytes) -> None:
+        def _write(
+            self, status: int, headers: dict[str, str],
+            body: bytes | Path | Iterator[bytes],
+        ) -> None:
+            if isinstance(body, Path):
+                self._write_file(status, headers, body)
+                return
+            if not isinstance(body, (bytes, bytearray)):
+                self._write_chunked(status, headers, body)
+                return
             self.send_response(status)
             for k, v in headers.items():
                 self.send_header(k, v)
-            self.send_header("Connection", "close")
+            # Keep-alive needs an explicit length on every response that
+            # carries a body; 304s have none by definition.
+            if "Content-Length" not in headers and status != 304:
+                self.send_header("Content-Length", str(len(body)))
             self.end_headers()
             self.wfile.write(body)
 
-        def _serve_static(self, rel: str) -> None:
-            if not rel:
-                rel = "index.html"
-            target = (_STATIC_DIR / rel).resolve()
+        def _write_chunked(
+            self, status: int, headers: dict[str, str], chunks: Iterator[bytes],
+        ) -> None:
+            """
+            Send an iterator body with Transfer-Encoding: chunked so the first
+            bytes leave before the last are produced. HTTP/1.0 clients can't
+            parse chunks; they get the raw bytes delimited by closing the
+            connection. (Joining would never finish for /api/events.)
+            """
+            chunked = self.request_version == "HTTP/1.1"
+            self.send_response(status)
+            for k, v in headers.items():
+                self.send_header(k, v)
+            if chunked:
+                self.send_header("Transfer-Encoding", "chunked")
+            else:
+                self.send_header("Connection", "close")
+                self.close_connection = True
+            self.end_headers()
+            write = self.wfile.write
             try:
-                target.relative_to(_STATIC_DIR.resolve())
-            except ValueError:
-                self._write(404, {"Content-Type": "text/plain"}, b"not found\n")
+                for chunk in chunks:
+                    if not chunk:
+                        continue
+                    if chunked:
+                        write(b"%X\r\n%b\r\n" % (len(chunk), chunk))
+                    else:
+                        write(chunk)
+                if chunked:
+                    write(b"0\r\n\r\n")
+            except (BrokenPipeError, ConnectionResetError):
+                # Client went away mid-stream (closed tab, EventSource reconnect).
+                self.close_connection = True
+            except Exception as e:
+                # Headers are gone already, so no error response is possible:
+                # drop the connection so the client sees a truncated body.
+                self.close_connection = True
+                self.log_message("aborted streamed response: %r", e)
+            finally:
+                close = getattr(chunks, "close", None)
+                if close is not None:
+                    close()
+
+        def _write_file(self, status: int, headers: dict[str, str], path: Path) -> None:
+            """
+            Stream a file body with socket.sendfile(): os.sendfile() copies
+            page cache straight to the socket, no Python-side buffers (plain
+            send() loop on platforms without it). Content-Length comes from
+            fstat of the open file so it always matches what we send.
+            """
+            try:
+                f = path.open("rb")
+            except OSError:
+                self._err(404, "not found")
                 return
-            if not target.exists() or not target.is_file():
+            with f:
+                size = os.fstat(f.fileno()).st_size
+                self.send_response(status)
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                self.send_header("Content-Length", str(size))
+                self.end_headers()
+                if size:
+                    self.connection.sendfile(f, 0, size)
+
+        def _serve_index(self) -> None:
+            built = _versioned_index()
+            if built is None:
+                self._serve_static("index.html")
+                return
+            body, gz, etag = built
+            # no-cache + ETag: the page is revalidated on every load (so new
+            # asset hashes are seen at once) but an unchanged one costs a 304.
+            if api_mod.etag_matches(self.headers.get("If-None-Match"), etag):
+                self._write(304, {"ETag": etag, "Cache-Control": "no-cache"}, b"")
+                return
+            headers = {
+                "Content-Type": "text/html; charset=utf-8",
+                "Cache-Control": "no-cache",
+                "Vary": "Accept-Encoding",
+                "ETag": etag,
+            }
+            if _accepts_gzip(self.headers.get("Accept-Encoding")):
+                headers["Content-Encoding"] = "gzip"
+                body = gz
+            self._write(200, headers, body)
+
+        def _serve_static(self, rel: str, versioned: bool = False) -> None:
+            if not rel:
+                rel = "index.html"
+            entry = _static_entry(rel)
+            st = None
+            if entry is not None:
+                target, ctype, compressible = entry
+                try:
+                    st = target.stat()
+                except OSError:
+                    pass
+            if st is None or not stat.S_ISREG(st.st_mode):
                 self._write(404, {"Content-Type": "text/plain"}, b"not found\n")
                 return
-            mime, _ = mimetypes.guess_type(str(target))
-            mime = mime or "application/octet-stream"
-            body = target.read_bytes()
-            # Default: no-store so dev edits to app.js / style.css / index.html
-            # propagate on plain F5 without stale-cache footguns. Vendored
+            # Default: no-cache + ETag so dev edits to app.js / style.css /
+            # index.html propagate on plain F5 without stale-cache footguns,
+            # while unchanged files revalidate as a bodiless 304. Vendored
             # libraries (marked, highlight) are long-cached because they don't
             # change between sessions.
-            cache_ctl = "no-store"
-            if rel.startswith("vendor/"):
+            etag = api_mod.file_etag(st)
+            cache_ctl = "no-cache"
+            if versioned:
+                # ?v=<hash> URL from _versioned_index(): new content, new URL.
+                cache_ctl = IMMUTABLE_CACHE
+            elif rel.startswith("vendor/"):
                 cache_ctl = "public, max-age=86400, immutable"
-            self._write(200, {
-                "Content-Type": mime + ("; charset=utf-8" if mime.startswith("text/") or mime.endswith("javascript") or mime.endswith("json") else ""),
-                "Content-Length": str(len(body)),
+            if api_mod.etag_matches(self.headers.get("If-None-Match"), etag):
+                self._write(304, {"ETag": etag, "Cache-Control": cache_ctl}, b"")
+                return
+            headers = {
+                "Content-Type": ctype,
                 "Cache-Control": cache_ctl,
-            }, body)
+                "ETag": etag,
+            }
+            if compressible:
+                headers["Vary"] = "Accept-Encoding"
+                if _accepts_gzip(self.headers.get("Accept-Encoding")):
+                    gz = _gzipped_file(target)
+                    if gz is not None:
+                        headers["Content-Encoding"] = "gzip"
+                        headers["Content-Length"] = str(len(gz))
+                        self._write(200, headers, gz)
+                        return
+            self._write(200, headers, target)
 
         def _err(self, status: int, msg: str) -> None:
             body = msg.encode("utf-8") + b"\n"
@@ -99,39 +459,47 @@ def make_handler(state: api_mod.AppState) -> type:
 
             # Static / index
             if path == "/" or path == "/index.html":
-                self._serve_static("index.html")
+                self._serve_index()
                 return
             if path.startswith("/static/"):
-                self._serve_static(path[len("/static/"):])
+                self._serve_static(path[len("/static/"):], versioned="v" in query)
                 return
 
             try:
                 if path == "/api/config":
                     self._send(api_mod.handle_config(state))
                     return
+                if path == "/api/events":
+                    self._send(api_mod.handle_events(state))
+                    return
                 if path == "/api/projects":
-                    self._send(api_mod.handle_projects(state))
+                    self._send(api_mod.handle_projects(
+                        state, self.headers.get("If-None-Match"),
+                    ))
                     return
-                m = _RE_PROJECT_DATES.match(path)
-                if m:
-                    self._send(api_mod.handle_project_dates(state, m["id"]))
+                m = _RE_API_ROUTE.match(path)
+                route = m.lastgroup if m else None
+                if route == "dates":
+                    self._send(api_mod.handle_project_dates(
+                        state, m["dates_id"], self.headers.get("If-None-Match"),
+                        wait="wait" in query,
+                    ))
                     return
-                m = _RE_SESSION_BLOB.match(path)
-                if m:
-                    proj, sess = _split_first_slash(m["rest"])
+                if route == "blob":
+                    proj, sess = _split_first_slash(m["blob_rest"])
                     self._send(api_mod.handle_blob(
-                        state, proj, sess, m["kind"], m["name"]
+                        state, proj, sess, m["kind"], m["name"],
+                        self.headers.get("If-None-Match"),
+                        _accepts_gzip(self.headers.get("Accept-Encoding")),
                     ))
                     return
-                m = _RE_SESSION_ENTRIES.match(path)
-                if m:
-                    proj, sess = _split_first_slash(m["rest"])
+                if route == "entries":
+                    proj, sess = _split_first_slash(m["entries_rest"])
                     indices = api_mod.parse_indices((query.get("indices") or [""])[0])
                     self._send(api_mod.handle_session_entries(state, proj, sess, indices))
                     return
-                m = _RE_SESSION_STUBS.match(path)
-                if m:
-                    proj, sess = _split_first_slash(m["rest"])
+                if route == "stubs":
+                    proj, sess = _split_first_slash(m["stubs_rest"])
                     if not sess:
                         self._err(400, "missing session path")
                         return
@@ -139,7 +507,8 @@ def make_handler(state: api_mod.AppState) -> type:
                     limit = self._int(query.get("limit"), default=200, lo=1, hi=500)
                     with_meta = (offset == 0)
                     self._send(api_mod.handle_session_stubs(
-                        state, proj, sess, offset, limit, with_meta
+                        state, proj, sess, offset, limit, with_meta,
+                        self.headers.get("If-None-Match"),
                     ))
                     return
             except Exception as e:
@@ -148,8 +517,58 @@ def make_handler(state: api_mod.AppState) -> type:
 
             self._err(404, f"not found: {path}")
 
-        def _send(self, resp: tuple[int, dict[str, str], bytes]) -> None:
-            self._write(*resp)
+        def do_POST(self) -> None:  # noqa: N802 (BaseHTTPRequestHandler API)
+            path = urllib.parse.urlparse(self.path).path
+            # Drain any body so the keep-alive connection stays in sync. A
+            # body we won't read in full (too big, unparseable length,
+            # chunked) would leave bytes that parse as the next request
+            # line, so those get an error and the connection is closed.
+            raw_length = self.headers.get("Content-Length")
+            try:
+                length = int(raw_length) if raw_length else 0
+            except ValueError:
+                length = -1
+            if length < 0 or length > MAX_POST_BODY or "Transfer-Encoding" in self.headers:
+                self.close_connection = True
+                msg = b"request body too large\n" if length > MAX_POST_BODY else b"bad request\n"
+                self._write(413 if length > MAX_POST_BODY else 400, {
+                    "Content-Type": "text/plain; charset=utf-8",
+                    "Connection": "close",
+                }, msg)
+                return
+            if length:
+                self.rfile.read(length)
+            try:
+                if path == "/api/refresh":
+                    self._send(api_mod.handle_refresh(state))
+                    return
+            except Exception as e:
+                self._err(500, f"internal error: {e!r}")
+                return
+            self._err(404, f"not found: {path}")
+
+        def _send(self, resp: tuple[int, dict[str, str], bytes | Path | Iterator[bytes]]) -> None:
+            status, headers, body = resp
+            mime = headers.get("Content-Type", "").split(";")[0]
+            if isinstance(body, Path) or "Content-Encoding" in headers:
+                pass  # files are sent as they are on disk
+            elif isinstance(body, bytes):
+                if len(body) >= GZIP_MIN_BYTES and _is_compressible(mime):
+                    headers["Vary"] = "Accept-Encoding"
+                    if _accepts_gzip(self.headers.get("Accept-Encoding")):
+                        etag = headers.get("ETag")
+                        body = (_gzipped_etag_body(etag, body) if etag
+                                else gzip.compress(body, compresslevel=6))
+                        headers["Content-Encoding"] = "gzip"
+                        headers["Content-Length"] = str(len(body))
+            elif mime == "application/json":
+                # Streamed JSON (/entries). Not event streams: those must
+                # reach the browser line by line, uncompressed.
+                headers["Vary"] = "Accept-Encoding"
+                if _accepts_gzip(self.headers.get("Accept-Encoding")):
+                    body = _gzip_chunks(body)
+                    headers["Content-Encoding"] = "gzip"
+            self._write(status, headers, body)
 
         @staticmethod
         def _int(v, default: int, lo: int, hi: int) -> int:
@@ -170,10 +589,42 @@ def make_handler(state: api_mod.AppState) -> type:
     return Handler
 
 
+class PooledHTTPServer(ThreadingHTTPServer):
+    """
+    ThreadingHTTPServer that hands accepted connections to a fixed set of
+    worker threads instead of starting a new thread for each one.
+
+    The workers are plain daemon threads fed by a queue rather than a
+    ThreadPoolExecutor: executor threads are joined at interpreter exit, so
+    one idle browser connection would hold up Ctrl+C.
+    """
+    # listen() backlog. The default of 5 drops SYNs when a page load opens
+    # a burst of parallel connections.
+    request_queue_size = 64
+
+    def __init__(self, server_address, handler_cls, workers: int = HTTP_WORKERS) -> None:
+        super().__init__(server_address, handler_cls)
+        self._requests: queue.Queue = queue.Queue()
+        for i in range(workers):
+            threading.Thread(
+                target=self._worker, daemon=True, name=f"http:{i}",
+            ).start()
+
+    def process_request(self, request, client_address) -> None:
+        self._requests.put((request, client_address))
+
+    def _worker(self) -> None:
+        while True:
+            request, client_address = self._requests.get()
+            # ThreadingMixIn's per-thread body: finish + error handling +
+            # shutdown_request.
+            self.process_request_thread(request, client_address)
+
+
 def serve(state: api_mod.AppState, host: str, port: int) -> None:
     """Blocking. Press Ctrl+C to stop."""
     handler_cls = make_handler(state)
-    httpd = ThreadingHTTPServer((host, port), handler_cls)
+    httpd = PooledHTTPServer((host, port), handler_cls)
     httpd.allow_reuse_address = True
     try:
         httpd.serve_forever()
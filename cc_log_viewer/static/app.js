@@ -11,8 +11,9 @@ const ROW_H_INNER = 28;          // expanded span's inner row
 const ROW_H_COMPACT = 30;        // compaction divider
 const ROW_BUFFER_PX = 240;
 const STUB_PAGE = 200;
-const PROJECT_POLL_MS = 800;
+const PROJECT_POLL_MS = 800;     // min spacing between /dates long polls
 const SESSION_POLL_MS = 700;
+const LIVE_REFRESH_MS = 500;
 const STUB_RETRY_MS = 900;
 const MAX_STUB_RETRIES = 30;
 const ENTRY_BATCH_NEIGHBORS = 3;
@@ -56,6 +57,7 @@ const S = {
   selectedDate: null,
   selectedSession: null,
   pollProjectTimer: null,
+  pollProjectSeq: 0,         // bumps per /dates request; stale answers are dropped
   pollSessionTimer: null,
 
   sessionMeta: null,         // {total, by_date, day_map, filter_classes, ...}
@@ -119,11 +121,16 @@ function initDom() {
 }
 
 // ===== Helpers =====
+const ESC_MAP = { "&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#39;" };
+const ESC_TEST = /[&<>"']/;
+const ESC_ALL = /[&<>"']/g;
+const escChar = (c) => ESC_MAP[c];
 function escHtml(s) {
   if (s == null) return "";
-  return String(s).replace(/[&<>"']/g, (c) => ({
-    "&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#39;",
-  }[c]));
+  s = String(s);
+  // Most values (ids, paths, labels) contain nothing to escape: return them
+  // as-is instead of allocating a copy.
+  return ESC_TEST.test(s) ? s.replace(ESC_ALL, escChar) : s;
 }
 function showToast(msg, ms = 1800) {
   if (!D.toast) return;
@@ -207,6 +214,8 @@ async function boot() {
 
   bindEvents();
   buildFilterBar();
+  // Subscribe first: a change landing while the list loads still counts.
+  listenForChanges();
   await loadProjects();
 
   const st = readUrlState();
@@ -322,6 +331,8 @@ function refreshAll() {
   S.projectDates = null;
   (async () => {
     try {
+      // Ask the server to drop its short-lived caches and rescan first.
+      try { await fetch("/api/refresh", { method: "POST" }); } catch (_) {}
       await loadProjects();
       if (projId) {
         const p = S.projects.find((x) => x.id === projId);
@@ -334,6 +345,23 @@ function refreshAll() {
   })();
 }
 
+// ===== Live updates =====
+// live.js delivers the server's "change" events (including any that came
+// before we subscribed); refresh the project list and (if idle) the open
+// project's dates. Bursts of appends collapse into one refresh.
+function listenForChanges() {
+  if (!window.ccLive) return;
+  let timer = null;
+  window.ccLive.subscribe(() => {
+    if (timer) return;
+    timer = setTimeout(async () => {
+      timer = null;
+      await loadProjects();
+      if (S.selectedProjectId) await pollProjectDates();
+    }, LIVE_REFRESH_MS);
+  });
+}
+
 // ===== Projects =====
 async function loadProjects() {
   const r = await fetchJSON("/api/projects");
@@ -380,10 +408,17 @@ async function selectProject(p) {
   await pollProjectDates();
 }
 
-async function pollProjectDates() {
+// While sessions are still indexing, the follow-up requests long-poll
+// (?wait=1): the server answers when one of them finishes, not on a timer.
+async function pollProjectDates(wait) {
   if (!S.selectedProjectId) return;
-  const url = `/api/projects/${encodeURIComponent(S.selectedProjectId)}/dates`;
+  if (S.pollProjectTimer) { clearTimeout(S.pollProjectTimer); S.pollProjectTimer = null; }
+  const seq = ++S.pollProjectSeq;
+  const started = Date.now();
+  const url = `/api/projects/${encodeURIComponent(S.selectedProjectId)}/dates${wait ? "?wait=1" : ""}`;
   const r = await fetchJSON(url);
+  // A newer request (project switch, live update) superseded this one.
+  if (seq !== S.pollProjectSeq) return;
   if (r.status === 0 || r.data == null) {
     D.dateList.innerHTML = `<div class="indexing-banner">Server unreachable</div>`;
     return;
@@ -391,7 +426,8 @@ async function pollProjectDates() {
   S.projectDates = r.data;
   renderDateList();
   if (r.data.in_progress > 0) {
-    S.pollProjectTimer = setTimeout(pollProjectDates, PROJECT_POLL_MS);
+    const delay = Math.max(0, PROJECT_POLL_MS - (Date.now() - started));
+    S.pollProjectTimer = setTimeout(() => pollProjectDates(true), delay);
   }
 }
 
@@ -948,7 +984,7 @@ function renderPrimary(g, top) {
     <div class="row-body">
       <div class="row-head">
         <span class="row-role">${role}</span>
-        <span class="row-time">${escHtml(time)}</span>
+        <span class="row-time">${time}</span>
       </div>
       <div class="row-preview">${escHtml(preview)}</div>
     </div>
@@ -977,21 +1013,23 @@ function renderSpan(g, top) {
   const arrow = expanded ? "▼" : "▶";
   const h = groupHeight(g);
 
-  let html = `<div class="span-row${expanded ? " expanded" : ""}" data-span-start="${g.start}" data-span-end="${g.end}" style="top:${top}px; height:${ROW_H_SPAN}px;">
+  const head = `<div class="span-row${expanded ? " expanded" : ""}" data-span-start="${g.start}" data-span-end="${g.end}" style="top:${top}px; height:${ROW_H_SPAN}px;">
     <span class="span-arrow">${arrow}</span>
     <span class="span-summary">${summary}</span>
-    <span class="span-time">${escHtml(tRange)}</span>
+    <span class="span-time">${tRange}</span>
   </div>`;
-
-  if (expanded) {
-    let innerTop = top + ROW_H_SPAN;
-    for (let i = g.start; i < g.end; i++) {
-      if (!filters[fc[i]]) continue;
-      html += renderInnerRow(i, fc[i], innerTop);
-      innerTop += ROW_H_INNER;
-    }
+  if (!expanded) return head;
+
+  // An expanded span can hold thousands of inner rows: collect and join once
+  // instead of growing one string row by row.
+  const parts = [head];
+  let innerTop = top + ROW_H_SPAN;
+  for (let i = g.start; i < g.end; i++) {
+    if (!filters[fc[i]]) continue;
+    parts.push(renderInnerRow(i, fc[i], innerTop));
+    innerTop += ROW_H_INNER;
   }
-  return html;
+  return parts.join("");
 }
 
 function renderInnerRow(eIdx, cls, top) {
@@ -1003,7 +1041,7 @@ function renderInnerRow(eIdx, cls, top) {
   const preview = stub ? (stub.preview || "") : "loading…";
   return `<div class="row inner cls-${cls}${selected}" data-entry-idx="${eIdx}" style="top:${top}px; height:${ROW_H_INNER - 2}px;">
     <span class="row-icon">${tag.icon}</span>
-    <span class="row-time">${escHtml(time)}</span>
+    <span class="row-time">${time}</span>
     <span class="row-tag">${escHtml(tagText.slice(0, 9))}</span>
     <span class="row-preview">${escHtml(preview)}</span>
   </div>`;
@@ -1318,8 +1356,9 @@ function renderToolUseBlock(blk) {
   let body = "";
   if (input && typeof input === "object") {
     if (name === "Bash" && typeof input.command === "string") {
-      body = `<pre>${escHtml(input.command)}</pre>`;
-      if (input.description) body += `<div class="block-flag" style="margin-top:6px">${escHtml(input.description)}</div>`;
+      const desc = input.description
+        ? `<div class="block-flag" style="margin-top:6px">${escHtml(input.description)}</div>` : "";
+      body = `<pre>${escHtml(input.command)}</pre>${desc}`;
     } else {
       try { body = `<pre>${escHtml(JSON.stringify(input, null, 2))}</pre>`; }
       catch (_) { body = `<pre>${escHtml(String(input))}</pre>`; }
@@ -1332,6 +1371,7 @@ function renderToolUseBlock(blk) {
     <div class="block-content">${body}</div>
   </div>`;
 }
+const BLOB_REF_RE = /tool-results\/[a-zA-Z0-9._-]+/g;
 function renderToolResultBlock(blk) {
   const id = blk.tool_use_id || "";
   const raw = blk.content;
@@ -1349,12 +1389,14 @@ function renderToolResultBlock(blk) {
   const [show, full] = maybeTruncate(text || "");
   let extra = "";
   if (full) extra = `<button class="show-more">Show full (${full.length.toLocaleString()} chars)</button>`;
-  let blobButtons = "";
-  const blobRefs = (text || "").match(/tool-results\/[a-zA-Z0-9._-]+/g) || [];
-  for (const ref of new Set(blobRefs)) {
+  // Literal pre-check: tool results run to megabytes and almost never
+  // reference a blob, so skip the regex scan unless the marker is present.
+  const blobRefs = (text && text.includes("tool-results/"))
+    ? (text.match(BLOB_REF_RE) || []) : [];
+  const blobButtons = Array.from(new Set(blobRefs), (ref) => {
     const name = ref.split("/").pop();
-    blobButtons += `<button class="show-more" data-blob="${escHtml(name)}">Load full output: ${escHtml(name)}</button>`;
-  }
+    return `<button class="show-more" data-blob="${escHtml(name)}">Load full output: ${escHtml(name)}</button>`;
+  }).join("");
   const errFlag = blk.is_error ? ` · ⚠ error` : "";
   return `<div class="block block-tool-result collapsed">
     <div class="block-header"><span>tool result</span><span class="block-flag">id ${escHtml(String(id).slice(0, 8))}…${errFlag}</span></div>
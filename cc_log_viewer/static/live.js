@@ -0,0 +1,64 @@
+// cc-log-viewer live-update transport.
+// Subscribes to the server's /api/events stream and hands every "change"
+// event to the callbacks registered with window.ccLive.subscribe(); app.js
+// decides what to reload. A change that arrives before anyone subscribed is
+// remembered and delivered on subscribe, so the first view can't miss it.
+// Kept apart from app.js so it's cached independently and survives
+// frontend edits unchanged; loaded before it so window.ccLive exists when
+// app.js boots.
+//
+// Each /api/events stream pins a server worker, so with several tabs open
+// only one (the holder of a Web Lock) subscribes and relays the events to
+// its siblings over a BroadcastChannel. When the leader closes, the lock
+// passes to another tab. Browsers without Web Locks or BroadcastChannel
+// keep one stream per tab.
+
+(() => {
+"use strict";
+
+const LIVE_CHANNEL = "cc-log-viewer";  // BroadcastChannel / Web Lock name
+
+const subscribers = [];
+let missed = false;
+
+window.ccLive = {
+  subscribe(fn) {
+    subscribers.push(fn);
+    if (missed) {
+      missed = false;
+      fn();
+    }
+  },
+};
+
+if (!window.EventSource) return;
+
+const notify = () => {
+  if (!subscribers.length) {
+    missed = true;
+    return;
+  }
+  for (const fn of subscribers) fn();
+};
+
+const subscribe = (relay) => {
+  const es = new EventSource("/api/events");
+  es.addEventListener("change", () => {
+    if (relay) relay.postMessage("change");
+    notify();
+  });
+};
+
+if (!window.BroadcastChannel || !(navigator.locks && navigator.locks.request)) {
+  subscribe(null);
+  return;
+}
+const bc = new BroadcastChannel(LIVE_CHANNEL);
+bc.onmessage = (e) => { if (e.data === "change") notify(); };
+// Held until the tab goes away.
+navigator.locks.request(LIVE_CHANNEL + ":leader", () => {
+  subscribe(bc);
+  return new Promise(() => {});
+}).catch(() => {});
+
+})();
@@ -0,0 +1,375 @@
+"""
+Change tracking for the ~/.claude/projects tree.
+
+The request path wants a cheap answer to "has any session jsonl changed since
+I last looked?" without stat'ing every file on every /api/projects call. The
+ProjectsWatcher keeps a monotonically increasing `generation` that callers
+compare against a remembered value.
+
+It also collects the changed jsonl paths into a dirty set and hands them to
+listeners once writes have been quiet for DEBOUNCE_SECONDS, so open sessions
+can be re-indexed before anyone asks for them.
+
+Every tree walk also records the newest session jsonl mtime per project,
+and events keep that map current, so /api/projects can order projects
+without stat'ing each session file.
+
+Two backends:
+- watchdog (inotify on Linux, FSEvents/kqueue elsewhere) when the package is
+  importable. Events bump the generation. Kernel event queues can overflow
+  and drop events, so the tree is still re-walked every
+  SAFETY_RESCAN_SECONDS; if the observer can't start (inotify watch limit)
+  or dies, the watcher falls back to polling.
+- polling fallback: a daemon thread re-walks the tree every WATCH_INTERVAL
+  seconds and bumps the generation when the (path, size, mtime) signature
+  changes. nudge() wakes it early; wakes arriving within DEBOUNCE_SECONDS
+  of each other share a single walk. Forced with CC_LOG_WATCH=poll, which
+  is what you want on NFS/AFS mounts where inotify never sees writes made
+  from other hosts.
+"""
+
+from __future__ import annotations
+
+import os
+import stat
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Collection
+
+from . import cache as cache_mod
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+    HAS_WATCHDOG = True
+except ImportError:
+    HAS_WATCHDOG = False
+
+
+# Seconds between tree walks in polling mode. Anything user-visible arrives
+# through nudge() (refresh button) or the event backend, so the idle walk can
+# be lazy.
+WATCH_INTERVAL = 10.0
+
+# Seconds between safety re-walks under the watchdog backend.
+SAFETY_RESCAN_SECONDS = 300.0
+
+# A live session appends in bursts; listeners hear about dirty paths only
+# after this many seconds without a further change.
+DEBOUNCE_SECONDS = 0.5
+
+
+class ProjectsWatcher:
+    """
+    Thread-safe change counter for session jsonl files under `root`.
+
+    `generation` only ever increases; equal generations mean nothing relevant
+    changed in between. Call start() once; stop() on shutdown.
+    """
+    def __init__(self, root: Path, interval: float = WATCH_INTERVAL) -> None:
+        self.root = root
+        self.interval = interval
+        self._lock = threading.Lock()
+        # Signalled on every bump; wait_for_change() blocks on it.
+        self._changed = threading.Condition(self._lock)
+        self.generation = 0
+        self._observer = None
+        self._thread: threading.Thread | None = None
+        self._signature: list[tuple[str, int, int]] | None = None
+        # _wake cuts the poll loop's wait short (refresh / shutdown);
+        # _shutdown ends it.
+        self._wake = threading.Event()
+        self._shutdown = threading.Event()
+        # jsonl paths changed since listeners were last called.
+        self._dirty: set[str] = set()
+        self._dirty_at = 0.0
+        self._dirty_wake = threading.Event()
+        self._listeners: list[Callable[[set[str]], None]] = []
+        # project dir name -> newest top-level session jsonl mtime.
+        self._project_mtimes: dict[str, float] = {}
+        # Projects an event touched while a walk was running; the walk's
+        # stats for them may predate the event.
+        self._touched: set[str] | None = None
+        self._root_prefix = str(root) + os.sep
+        mode = os.environ.get("CC_LOG_WATCH", "").lower()
+        self.backend = "watchdog" if HAS_WATCHDOG and mode != "poll" else "poll"
+
+    # ---- public ----------------------------------------------------------
+
+    def add_listener(self, fn: Callable[[set[str]], None]) -> None:
+        """Call fn(changed_jsonl_paths) after each debounced burst of writes."""
+        self._listeners.append(fn)
+
+    def start(self) -> None:
+        threading.Thread(
+            target=self._dispatch_loop, daemon=True, name="watcher:dispatch",
+        ).start()
+        if self.backend == "watchdog" and self.root.is_dir():
+            try:
+                observer = Observer()
+                observer.schedule(_EventHandler(self), str(self.root), recursive=True)
+                observer.daemon = True
+                observer.start()
+                self._observer = observer
+            except OSError:
+                # Typically ENOSPC: out of inotify watches on a big tree.
+                self._observer = None
+        if self._observer is None:
+            self.backend = "poll"
+            # Baseline before serving, so no write can slip in unnoticed.
+            # Under watchdog, events cover that window and the safety
+            # rescan takes its baseline in the background.
+            self._signature = self._rescan()
+        self._thread = threading.Thread(
+            target=self._poll_loop, daemon=True, name="watcher:poll",
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._shutdown.set()
+        self._wake.set()
+        self._dirty_wake.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer = None
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def nudge(self) -> None:
+        """
+        Treat the tree as changed now (user hit refresh). Bumps the
+        generation so cached listings are rebuilt on the next request, and
+        wakes the poll loop so its baseline catches up without waiting out
+        the interval.
+        """
+        with self._lock:
+            # Until the walk catches up, callers stat for themselves.
+            self._project_mtimes = {}
+        self._bump()
+        self._wake.set()
+
+    def project_mtimes(self) -> dict[str, float]:
+        """
+        Newest top-level session jsonl mtime per project dir name, from the
+        last tree walk plus events since. Projects missing from the map
+        (not walked yet, or touched by a delete/rename) are unknown and
+        have to be stat'ed by the caller.
+        """
+        with self._lock:
+            return dict(self._project_mtimes)
+
+    def wait_for_change(self, since: int, timeout: float) -> int:
+        """
+        Block until `generation` differs from `since` or `timeout` seconds
+        pass; return the generation either way.
+        """
+        with self._changed:
+            self._changed.wait_for(lambda: self.generation != since, timeout)
+            return self.generation
+
+    def describe(self) -> str:
+        """One-line label for the startup banner."""
+        if self.backend == "watchdog":
+            return "filesystem events (watchdog)"
+        return f"polling every {self.interval:g}s"
+
+    # ---- internals -------------------------------------------------------
+
+    def _bump(self, paths: Collection[str] = ()) -> None:
+        with self._lock:
+            self.generation += 1
+            self._changed.notify_all()
+            if paths:
+                self._dirty.update(paths)
+                self._dirty_at = time.monotonic()
+                self._dirty_wake.set()
+
+    def _dispatch_loop(self) -> None:
+        """Hand the dirty set to listeners once writes go quiet."""
+        while not self._shutdown.is_set():
+            self._dirty_wake.wait()
+            self._dirty_wake.clear()
+            # Debounce: keep waiting while changes keep arriving.
+            while not self._shutdown.is_set():
+                with self._lock:
+                    quiet = time.monotonic() - self._dirty_at
+                if quiet >= DEBOUNCE_SECONDS:
+                    break
+                self._shutdown.wait(DEBOUNCE_SECONDS - quiet)
+            with self._lock:
+                dirty, self._dirty = self._dirty, set()
+            if not dirty or self._shutdown.is_set():
+                continue
+            for fn in self._listeners:
+                try:
+                    fn(dirty)
+                except Exception:
+                    # A listener bug must not kill change tracking.
+                    pass
+
+    def _note_paths(self, paths: Collection[str], mtime: float, gone: bool) -> None:
+        """Fold an event into the project mtime map."""
+        with self._lock:
+            for p in paths:
+                where = self._split_project(p)
+                if where is None:
+                    continue
+                project, top_level = where
+                if self._touched is not None:
+                    self._touched.add(project)
+                if gone:
+                    # The newest file may be the one that went away.
+                    self._project_mtimes.pop(project, None)
+                elif top_level and project in self._project_mtimes:
+                    # Only projects with a walked baseline; a lone event
+                    # says nothing about the project's other sessions.
+                    if mtime > self._project_mtimes[project]:
+                        self._project_mtimes[project] = mtime
+
+    def _split_project(self, path: str) -> tuple[str, bool] | None:
+        """
+        (project dir name, is a top-level session file) for a tree path.
+        "Session file" uses cache.scan_project()'s name filter, so the
+        published mtimes only count files the project listing shows.
+        """
+        if not path.startswith(self._root_prefix):
+            return None
+        project, sep, rest = path[len(self._root_prefix):].partition(os.sep)
+        return (project, bool(sep) and os.sep not in rest
+                and cache_mod.is_session_jsonl_name(rest))
+
+    def _poll_loop(self) -> None:
+        if self._signature is None:
+            self._signature = self._rescan()
+        last_walk = time.monotonic()
+        while not self._shutdown.is_set():
+            # Under watchdog the loop still wakes every `interval` to check
+            # the observer is alive; it only walks every SAFETY_RESCAN_SECONDS.
+            timeout = self.interval
+            if self._observer is not None:
+                timeout = min(timeout, max(
+                    0.0, last_walk + SAFETY_RESCAN_SECONDS - time.monotonic(),
+                ))
+            woken = self._wake.wait(timeout)
+            if woken:
+                # Woken early: let a burst of nudges (several tabs hitting
+                # refresh at once) settle so it costs one walk, not many.
+                self._shutdown.wait(DEBOUNCE_SECONDS)
+            self._wake.clear()
+            if self._shutdown.is_set():
+                break
+            observer = self._observer
+            if observer is not None and not observer.is_alive():
+                # The event thread died; nothing will bump the generation
+                # unless we poll. _event_generation() callers in api.py
+                # stop trusting it as soon as backend changes. Walk now to
+                # catch whatever it missed.
+                self._observer = None
+                self.backend = "poll"
+            elif (observer is not None and not woken and
+                    time.monotonic() - last_walk < SAFETY_RESCAN_SECONDS):
+                continue
+            last_walk = time.monotonic()
+            sig = self._rescan()
+            if sig != self._signature:
+                changed = set(sig).symmetric_difference(self._signature or ())
+                self._signature = sig
+                self._bump({p for p, _, _ in changed})
+
+    def _scan(self) -> list[tuple[str, int, int]]:
+        """(path, size, mtime_ns) for every session/subagent jsonl, sorted."""
+        out: list[tuple[str, int, int]] = []
+        _scan_dir(str(self.root), out)
+        out.sort()
+        return out
+
+    def _rescan(self) -> list[tuple[str, int, int]]:
+        """_scan(), publishing the per-project mtimes it saw."""
+        with self._lock:
+            self._touched = set()
+        sig = self._scan()
+        mtimes: dict[str, float] = {}
+        for path, _, mtime_ns in sig:
+            where = self._split_project(path)
+            if where is None or not where[1]:
+                continue
+            # Same rounding as os.stat_result.st_mtime.
+            mtime = mtime_ns // 1_000_000_000 + (mtime_ns % 1_000_000_000) * 1e-9
+            if mtime > mtimes.get(where[0], 0.0):
+                mtimes[where[0]] = mtime
+        with self._lock:
+            for project in self._touched:
+                mtimes.pop(project, None)
+            self._touched = None
+            self._project_mtimes = mtimes
+        return sig
+
+
+def _scan_dir(path: str, out: list[tuple[str, int, int]]) -> None:
+    """
+    Recursive os.scandir walk collecting jsonl signatures into `out`.
+
+    DirEntry.is_dir() answers from the dirent type on Linux, so only the
+    jsonl files themselves cost a stat; no Path objects are built. Hidden
+    directories (our own .cc-viewer-cache, .git, ...) are skipped whole.
+    """
+    try:
+        it = os.scandir(path)
+    except OSError:
+        return
+    with it:
+        for entry in it:
+            name = entry.name
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if not name.startswith("."):
+                        _scan_dir(entry.path, out)
+                elif name.endswith(".jsonl"):
+                    st = entry.stat()
+                    # Regular files only (after symlinks), as the listing.
+                    if stat.S_ISREG(st.st_mode):
+                        out.append((entry.path, st.st_size, st.st_mtime_ns))
+            except OSError:
+                continue
+
+
+# watchdog event types that mean a file's content or presence changed.
+# watchdog >= 4 also reports "opened" and "closed_no_write", which every
+# read of a session (indexing, /entries, labels) would otherwise turn into
+# a generation bump.
+_CHANGE_EVENTS = frozenset(("created", "modified", "closed", "deleted", "moved"))
+
+
+if HAS_WATCHDOG:
+    class _EventHandler(FileSystemEventHandler):
+        """Translate watchdog events into generation bumps."""
+        def __init__(self, watcher: ProjectsWatcher) -> None:
+            super().__init__()
+            self._watcher = watcher
+
+        def on_any_event(self, event) -> None:
+            if event.event_type not in _CHANGE_EVENTS:
+                return
+            paths = [event.src_path, getattr(event, "dest_path", "") or ""]
+            if any(cache_mod.CACHE_DIR_NAME in p for p in paths):
+                # Our own index writes; never interesting.
+                return
+            gone = event.event_type in ("deleted", "moved")
+            if event.is_directory:
+                # Project/session dirs appearing or vanishing.
+                if event.event_type in ("created", "deleted", "moved"):
+                    if gone:
+                        self._watcher._note_paths(paths, 0.0, True)
+                    self._watcher._bump()
+                return
+            for p in paths:
+                if p.endswith(".jsonl"):
+                    try:
+                        mtime = os.stat(p).st_mtime
+                    except OSError:
+                        mtime = 0.0
+                    self._watcher._note_paths([q for q in paths if q], mtime, gone)
+                    self._watcher._bump([p])
+                    return